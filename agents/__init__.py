@@ -1,6 +1,6 @@
 from agents.base_agent import OssBaseAgent
 from agents.web_searcher import MockWebSearch, MockWebSearchOutput, MockWebSearchResult
-from agents.company_finder import CompanyFinder, OutputCompanyInfo, DocumentSelectionResult
+from agents.company_finder import CompanyFinder, OutputCompanyInfo, DocumentSelectionResult, BatchDocumentSelectionResult
 from agents.document_translator import DocumentTranslator, DocumentTranslationOutput
 from agents.briefing_generator import BriefingGenerator, BriefingDocumentOutput, BriefingSection
 from agents.research_assistant import ResearchAssistant, BriefingOutput, ReActStep
@@ -20,6 +20,7 @@ __all__ = [
     "CompanyFinder",
     "OutputCompanyInfo",
     "DocumentSelectionResult",
+    "BatchDocumentSelectionResult",
     "DocumentTranslator",
     "DocumentTranslationOutput",
     "BriefingGenerator",
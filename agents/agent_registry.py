@@ -3,6 +3,9 @@ from dataclasses import dataclass, field
 from enum import Enum
 
 
+_DESCRIPTION_SEPARATOR = "\n\n" + "=" * 80 + "\n\n"
+
+
 class ParameterType(Enum):
     STRING = "string"
     INTEGER = "integer"
@@ -30,11 +33,13 @@ class AgentMetadata:
     agent_type: str
     callable_func: Optional[Callable] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _cached_llm_desc: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
 
 class AgentRegistry:
     def __init__(self):
         self._agents: Dict[str, AgentMetadata] = {}
+        self._by_type: Dict[str, List[AgentMetadata]] = {}
     
     def register_agent(
         self,
@@ -59,11 +64,17 @@ class AgentRegistry:
         )
         
         self._agents[name] = agent_metadata
+        self._by_type.setdefault(agent_type, []).append(agent_metadata)
     
     def unregister_agent(self, name: str) -> None:
         """Remove an agent from the registry."""
-        if name in self._agents:
-            del self._agents[name]
+        agent = self._agents.pop(name, None)
+        if agent is not None:
+            agent._cached_llm_desc = None
+            agents_of_type = self._by_type[agent.agent_type]
+            agents_of_type.remove(agent)
+            if not agents_of_type:
+                del self._by_type[agent.agent_type]
     
     def get_agent(self, name: str) -> Optional[AgentMetadata]:
         """Get agent metadata by name."""
@@ -72,7 +83,7 @@ class AgentRegistry:
     def list_agents(self, agent_type: Optional[str] = None) -> List[AgentMetadata]:
         """List all registered agents, optionally filtered by type."""
         if agent_type:
-            return [agent for agent in self._agents.values() if agent.agent_type == agent_type]
+            return list(self._by_type.get(agent_type, ()))
         return list(self._agents.values())
     
     def get_agent_names(self) -> List[str]:
@@ -85,29 +96,29 @@ class AgentRegistry:
         if not agent:
             return f"Agent '{name}' not found"
         
-        params_desc = []
-        for param in agent.parameters:
-            required_str = "required" if param.required else "optional"
-            default_str = f", default={param.default}" if param.default is not None else ""
-            params_desc.append(
-                f"  - {param.name} ({param.type.value}, {required_str}{default_str}): {param.description}"
-            )
+        if agent._cached_llm_desc is not None:
+            return agent._cached_llm_desc
         
-        params_text = "\n".join(params_desc) if params_desc else "  No parameters"
+        params_text = "\n".join([
+            f"  - {param.name} ({param.type.value}, {'required' if param.required else 'optional'}"
+            f"{f', default={param.default}' if param.default is not None else ''}): {param.description}"
+            for param in agent.parameters
+        ]) or "  No parameters"
         
-        return f"""Agent: {agent.name}
+        agent._cached_llm_desc = f"""Agent: {agent.name}
 Type: {agent.agent_type}
 Description: {agent.description}
 Parameters:
 {params_text}"""
+        return agent._cached_llm_desc
     
     def get_all_agents_description_for_llm(self) -> str:
         """Generate a formatted description of all agents for LLM consumption."""
-        descriptions = []
-        for name in sorted(self._agents.keys()):
-            descriptions.append(self.get_agent_description_for_llm(name))
+        descriptions = [
+            self.get_agent_description_for_llm(name) for name in sorted(self._agents.keys())
+        ]
         
-        return "\n\n" + "="*80 + "\n\n".join(descriptions)
+        return _DESCRIPTION_SEPARATOR + _DESCRIPTION_SEPARATOR.join(descriptions)
     
     async def call_agent(self, name: str, **kwargs) -> Any:
         """Call a registered agent with the provided arguments."""
@@ -1,24 +1,142 @@
 import asyncio
+import functools
+import hashlib
 import json
 import os
-import re
-from typing import Optional
+import weakref
+from typing import Dict, Optional, Tuple
 
+import httpx
 from dotenv import load_dotenv
 from huggingface_hub import AsyncInferenceClient
-from pydantic import BaseModel, ValidationError
+from huggingface_hub.errors import HfHubHTTPError, InferenceTimeoutError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from tenacity import (
     before_sleep_log,
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
+    stop_after_attempt,
     wait_exponential,
 )
 
+from utils import json_utils
+from utils.llm_cache import PersistentResponseCache
+
 ENV_FILE = os.getenv("RESARO_ENV")
 load_dotenv(dotenv_path=ENV_FILE)
 
 
-_HF_GLOBAL_SEMAPHORE = asyncio.Semaphore(256)
+HF_MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", "256"))
+# OpenAI-compatible server (e.g. `vllm serve`) to send chat completions to instead
+# of the Hugging Face Inference API; the model name is sent in each request.
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+# Let callers that ask for it constrain decoding to their JSON schema. Off by default
+# because not every hosted provider accepts json_schema response formats; vLLM does.
+LLM_GUIDED_DECODING = os.getenv("LLM_GUIDED_DECODING") == "1"
+# Number of validated LLM responses kept for exact prompt repeats. Off (0) by default,
+# since a hit replays one sampled output instead of drawing a new one.
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "0"))
+# Opt-in on-disk response cache that survives across runs, e.g. for repeated test prompts.
+RESARO_LLM_CACHE = os.getenv("RESARO_LLM_CACHE") == "1"
+RESARO_LLM_CACHE_DIR = os.getenv("RESARO_LLM_CACHE_DIR")
+
+# asyncio primitives bind to the loop that first uses them, so keep one
+# semaphore per running event loop instead of a single import-time global.
+_HF_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Agents talking to the same model with the same token share one client and
+# therefore one keep-alive connection pool. The pool's connections bind to the
+# loop that opened them, so like the semaphores there is one set per loop.
+_CLIENT_CACHE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Optional[str]], AsyncInferenceClient]]" = weakref.WeakKeyDictionary()
+
+_THINK_SUFFIX = "\n\nThink it through. If the answer is obvious, give it directly. If not, use ≤10 short steps. You have a budget of ≤500 words for reasoning. Don't exceed it./think"
+_NO_THINK_SUFFIX = "/no_think"
+_SCHEMA_PREAMBLE = "\n\nRespond with valid JSON matching this schema: "
+# Shared by every request; never mutate it.
+_SYSTEM_MSG = {"role": "system", "content": "You are a helpful assistant."}
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _get_client(model_name: str, api_key: Optional[str]) -> AsyncInferenceClient:
+    """Return the shared inference client for this model and token on the running event loop."""
+    loop = asyncio.get_running_loop()
+    clients = _CLIENT_CACHE.get(loop)
+    if clients is None:
+        clients = {}
+        _CLIENT_CACHE[loop] = clients
+    client = clients.get((model_name, api_key))
+    if client is None:
+        if LLM_BASE_URL:
+            client = AsyncInferenceClient(base_url=LLM_BASE_URL, token=api_key)
+        else:
+            client = AsyncInferenceClient(
+                model=model_name,
+                token=api_key,
+            )
+        clients[(model_name, api_key)] = client
+    return client
+
+
+def _get_hf_semaphore() -> asyncio.Semaphore:
+    """Return the request-limiting semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _HF_SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HF_MAX_CONCURRENCY)
+        _HF_SEMAPHORES[loop] = semaphore
+    return semaphore
+
+
+# Only network-level failures are worth another LLM call; schema and JSON
+# errors in the response are raised straight to the caller.
+_TRANSIENT_ERRORS = (
+    httpx.TransportError,
+    httpx.TimeoutException,
+    InferenceTimeoutError,
+    asyncio.TimeoutError,
+    TimeoutError,
+)
+# Attempts per generate() call, including the first, before the error is raised
+LLM_MAX_ATTEMPTS = 5
+
+
+def _is_transient_error(exc: BaseException) -> bool:
+    """Whether a failed LLM call may succeed if retried: transport errors, timeouts, 429 and 5xx."""
+    if isinstance(exc, HfHubHTTPError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, _TRANSIENT_ERRORS)
+
+
+# Validated responses as JSON, keyed on everything that shapes the request:
+# (model_name, system + user prompt digest, schema, think, temperature, max_tokens, guided).
+_RESPONSE_CACHE: Dict[tuple, str] = {}
+
+_PERSISTENT_CACHE: Optional[PersistentResponseCache] = (
+    PersistentResponseCache(RESARO_LLM_CACHE_DIR) if RESARO_LLM_CACHE else None
+)
+
+
+@functools.lru_cache(maxsize=128)
+def _schema_json(schema_cls: type[BaseModel]) -> str:
+    """Serialized JSON schema for a Pydantic model class, cached per class."""
+    return json_utils.dumps(schema_cls.model_json_schema())
+
+
+@functools.lru_cache(maxsize=128)
+def _response_format(schema_cls: type[BaseModel]) -> dict:
+    """OpenAI-style json_schema response format for a Pydantic model class, cached per class."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema_cls.__name__, "schema": schema_cls.model_json_schema(), "strict": True},
+    }
+
+
+@functools.lru_cache(maxsize=128)
+def _adapter(schema_cls: type[BaseModel]) -> TypeAdapter:
+    """Prebuilt TypeAdapter for a Pydantic model class, cached per class."""
+    return TypeAdapter(schema_cls)
 
 
 def extract_json_string(text: str) -> Optional[str]:
@@ -27,7 +145,7 @@ def extract_json_string(text: str) -> Optional[str]:
 
     This function handles two common formats:
     1. A JSON string embedded within a ```json ... ``` code block.
-    2. A raw JSON string, identified by the first '{' and the last '}'.
+    2. A raw JSON string, i.e. the first complete JSON value starting at the first '{'.
 
     Args:
         text: The input string to search for a JSON string.
@@ -38,15 +156,19 @@ def extract_json_string(text: str) -> Optional[str]:
     json_str = None
 
     # Case 1: Look for ```json ... ```
-    match = re.search(r"```json\s*(.*?)\s*```", text, re.DOTALL)
-    if match:
-        json_str = match.group(1).strip()
+    fence_start = text.find("```json")
+    fence_end = text.find("```", fence_start + 7) if fence_start != -1 else -1
+    if fence_end != -1:
+        json_str = text[fence_start + 7 : fence_end].strip()
     else:
-        # Case 2: Find first '{' and last '}'
+        # Case 2: Decode the first complete JSON value from the first '{'
         start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and start < end:
-            json_str = text[start : end + 1].strip()
+        if start != -1:
+            try:
+                _, end = _JSON_DECODER.raw_decode(text, start)
+            except json.JSONDecodeError:
+                return None
+            json_str = text[start:end]
 
     if json_str:
         return json_str
@@ -66,15 +188,18 @@ class OssBaseAgent:
         if api_key is None:
             api_key = os.getenv("HF_TOKEN")
         
-        self.client = AsyncInferenceClient(
-            model=model_name,
-            token=api_key,
-        )
+        self._api_key = api_key
         self.model_name = model_name
 
+    @property
+    def client(self) -> AsyncInferenceClient:
+        """Inference client for the running event loop; only valid inside a coroutine."""
+        return _get_client(self.model_name, self._api_key)
+
     @retry(
         reraise=True,
-        retry=retry_if_exception_type(Exception),
+        retry=retry_if_exception(_is_transient_error),
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
         wait=wait_exponential(multiplier=1, min=1, max=10),
     )
     async def generate(
@@ -84,16 +209,65 @@ class OssBaseAgent:
         think: bool = True,
         temperature: Optional[float] = None,
         max_tokens: int = 6144,
+        system_prompt: Optional[str] = None,
+        guided: bool = False,
     ) -> BaseModel:
-        async with _HF_GLOBAL_SEMAPHORE:
+        cache_key = None
+        persistent_key = None
+        if LLM_CACHE_SIZE > 0 or _PERSISTENT_CACHE is not None:
+            digest = hashlib.blake2b(digest_size=16)
+            if system_prompt is not None:
+                digest.update(system_prompt.encode())
+            digest.update(b"\0")
+            digest.update(input.encode())
+            if LLM_CACHE_SIZE > 0:
+                cache_key = (self.model_name, digest.digest(), schema, think, temperature, max_tokens, guided)
+                cached = _RESPONSE_CACHE.get(cache_key)
+                if cached is not None:
+                    return _adapter(schema).validate_json(cached)
+            if _PERSISTENT_CACHE is not None:
+                persistent_key = (
+                    f"{LLM_BASE_URL}|{self.model_name}|{schema.__module__}.{schema.__qualname__}|"
+                    f"{think}|{temperature}|{max_tokens}|{guided}|{digest.hexdigest()}"
+                )
+                cached = await asyncio.to_thread(_PERSISTENT_CACHE.get, persistent_key)
+                if cached is not None:
+                    try:
+                        result = _adapter(schema).validate_json(cached)
+                    except ValidationError:
+                        # Stored under an older version of the schema; regenerate
+                        pass
+                    else:
+                        self._remember_response(cache_key, cached)
+                        return result
+
+        async with _get_hf_semaphore():
             if think:
                 raw_json = await self._generate_with_think(
-                    input, schema, temperature, max_tokens
+                    input, schema, temperature, max_tokens, system_prompt
                 )
             else:
-                raw_json = await self._generate_without_think(input, schema, temperature, max_tokens)
+                raw_json = await self._generate_without_think(
+                    input, schema, temperature, max_tokens, system_prompt, guided
+                )
+
+            result = self._parse_and_validate_json(raw_json, input, schema)
 
-            return self._parse_and_validate_json(raw_json, input, schema)
+        if isinstance(result, BaseModel) and (cache_key is not None or persistent_key is not None):
+            result_json = result.model_dump_json()
+            self._remember_response(cache_key, result_json)
+            if persistent_key is not None:
+                await asyncio.to_thread(_PERSISTENT_CACHE.set, persistent_key, result_json)
+        return result
+
+    @staticmethod
+    def _remember_response(cache_key: Optional[tuple], result_json: str) -> None:
+        """Store a validated response in the in-process cache, evicting the oldest entry when full."""
+        if cache_key is None:
+            return
+        if len(_RESPONSE_CACHE) >= LLM_CACHE_SIZE:
+            _RESPONSE_CACHE.pop(next(iter(_RESPONSE_CACHE)))
+        _RESPONSE_CACHE[cache_key] = result_json
 
     async def _generate_with_think(
         self,
@@ -101,20 +275,16 @@ class OssBaseAgent:
         schema: BaseModel,
         temperature: Optional[float] = None,
         max_tokens: int = 6144,
+        system_prompt: Optional[str] = None,
     ) -> str:
         if temperature is None:
             temperature = 0.6
 
         messages = [
-            {
-                "role": "system",
-                "content": "You are a helpful assistant.",
-            },
+            _SYSTEM_MSG if system_prompt is None else {"role": "system", "content": system_prompt},
             {
                 "role": "user",
-                "content": input_str
-                + "\n\nThink it through. If the answer is obvious, give it directly. If not, use ≤10 short steps. You have a budget of ≤500 words for reasoning. Don't exceed it./think"
-                + f"\n\nRespond with valid JSON matching this schema: {json.dumps(schema.model_json_schema())}",
+                "content": f"{input_str}{_THINK_SUFFIX}{_SCHEMA_PREAMBLE}{_schema_json(schema)}",
             },
         ]
 
@@ -122,6 +292,7 @@ class OssBaseAgent:
             response = await asyncio.wait_for(
                 self.client.chat_completion(
                     messages=messages,
+                    model=self.model_name,
                     temperature=temperature,
                     top_p=0.95,
                     max_tokens=max_tokens,
@@ -139,19 +310,17 @@ class OssBaseAgent:
         schema: BaseModel,
         temperature: Optional[float] = None,
         max_tokens: int = 6144,
+        system_prompt: Optional[str] = None,
+        guided: bool = False,
     ) -> str:
         if temperature is None:
             temperature = 0.7
 
         messages = [
-            {
-                "role": "system",
-                "content": "You are a helpful assistant.",
-            },
+            _SYSTEM_MSG if system_prompt is None else {"role": "system", "content": system_prompt},
             {
                 "role": "user",
-                "content": input_str + "/no_think"
-                + f"\n\nRespond with valid JSON matching this schema: {json.dumps(schema.model_json_schema())}",
+                "content": f"{input_str}{_NO_THINK_SUFFIX}{_SCHEMA_PREAMBLE}{_schema_json(schema)}",
             },
         ]
 
@@ -159,9 +328,12 @@ class OssBaseAgent:
             response = await asyncio.wait_for(
                 self.client.chat_completion(
                     messages=messages,
+                    model=self.model_name,
                     temperature=temperature,
                     top_p=0.8,
                     max_tokens=max_tokens,
+                    # Grammar-constrained sampling can only emit schema-valid JSON
+                    response_format=_response_format(schema) if guided and LLM_GUIDED_DECODING else None,
                 ),
                 timeout=120.0
             )
@@ -173,11 +345,20 @@ class OssBaseAgent:
     def _parse_and_validate_json(
         self, raw_json: str, input_str: str, schema: BaseModel
     ) -> BaseModel:
+        adapter = _adapter(schema)
+        # Fast path: the whole response is the JSON object, so validate it
+        # directly instead of scanning for it first.
+        if raw_json.lstrip().startswith("{"):
+            try:
+                return adapter.validate_json(raw_json)
+            except ValidationError:
+                pass
+
         extracted_json = extract_json_string(raw_json)
         if extracted_json is None:
             raise ValueError(f"No valid JSON found in response:\n{raw_json}")
         try:
-            response = schema.model_validate_json(extracted_json)
+            response = adapter.validate_json(extracted_json)
         except Exception as e:
             raise e
         return response
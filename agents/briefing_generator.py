@@ -2,7 +2,8 @@ from agents.base_agent import OssBaseAgent
 from typing import Optional
 from pydantic import BaseModel
 from utils.logger import Logger
-import json
+from utils import json_utils
+import logging
 
 logger = Logger(__name__)
 
@@ -33,6 +34,8 @@ Company Profile:
 {company_profile}
 """
 
+_PROMPT_PREFIX, _, _PROMPT_SUFFIX = PROMPT.partition("{company_profile}")
+
 class BriefingSection(BaseModel):
     heading: str
     content: str
@@ -56,16 +59,14 @@ class BriefingGenerator(OssBaseAgent):
         company_profile: dict,
     ) -> BriefingDocumentOutput:
         logger.info("Generating briefing document")
-        logger.debug(f"Company: {company_profile.get('trade_name', 'Unknown')}")
-        logger.debug(f"Company ID: {company_profile.get('company_id', 'Unknown')}")
+        logger.debug("Company: %s", company_profile.get('trade_name', 'Unknown'))
+        logger.debug("Company ID: %s", company_profile.get('company_id', 'Unknown'))
         
-        company_profile_str = json.dumps(company_profile, indent=2)
-        logger.debug(f"Profile data size: {len(company_profile_str)} characters")
+        company_profile_str = json_utils.dumps(company_profile)
+        logger.debug("Profile data size: %d characters", len(company_profile_str))
         
-        full_prompt = PROMPT.format(
-            company_profile=company_profile_str
-        )
-        logger.debug(f"Prompt length: {len(full_prompt)} characters")
+        full_prompt = f"{_PROMPT_PREFIX}{company_profile_str}{_PROMPT_SUFFIX}"
+        logger.debug("Prompt length: %d characters", len(full_prompt))
         
         try:
             result = await self.generate(
@@ -73,17 +74,19 @@ class BriefingGenerator(OssBaseAgent):
                 schema=BriefingDocumentOutput,
                 think=False,
                 temperature=0.4,
+                guided=True,
             )
             
             logger.info(f"Briefing document generated successfully")
             logger.info(f"Title: {result.title}")
             logger.info(f"Risk level: {result.risk_level}")
-            logger.debug(f"Number of sections: {len(result.sections)}")
-            logger.debug(f"Number of key findings: {len(result.key_findings)}")
-            logger.debug(f"Number of recommendations: {len(result.recommendations)}")
-            
-            for i, section in enumerate(result.sections, 1):
-                logger.debug(f"Section {i}: {section.heading} ({len(section.content)} chars)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Number of sections: {len(result.sections)}")
+                logger.debug(f"Number of key findings: {len(result.key_findings)}")
+                logger.debug(f"Number of recommendations: {len(result.recommendations)}")
+                
+                for i, section in enumerate(result.sections, 1):
+                    logger.debug(f"Section {i}: {section.heading} ({len(section.content)} chars)")
             
             logger.info(f"Key findings summary:")
             for i, finding in enumerate(result.key_findings, 1):
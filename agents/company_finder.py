@@ -1,30 +1,39 @@
 from agents.base_agent import OssBaseAgent
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
-import json
-from rapidfuzz import fuzz
+from dataclasses import dataclass
+import asyncio
+import heapq
+import logging
+import mmap
+import os
+import threading
+from operator import itemgetter
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Levenshtein
 from utils.logger import Logger
+from utils import json_utils
 
 logger = Logger(__name__)
 
-PROMPT = """
-You are a company finder assistant. Your task is to select the correct company from a list of candidate companies based on the provided context.
+DATABASE_PATH = "database/enriched_companies_100.jsonl"
 
-You will be given:
-1. A query name - the company name being searched for
-2. Context - additional information about the company (e.g., location, industry, status, etc.)
-3. A list of indexed candidate companies with their details
+SEARCH_CACHE_SIZE = 1024
 
-Your job is to:
-- Carefully analyze the context and compare it with each candidate's information
-- Select the company that best matches the context by returning its index (0-based)
-- If none of the candidates match the context well enough, return null for the index
-- Consider factors like: location (city, country), industry, company status, employee count, revenue, and any other relevant details
+# A top candidate scoring at least FAST_PATH_MIN_SCORE that leads the runner-up
+# by FAST_PATH_MIN_GAP is returned without asking the LLM to choose.
+FAST_PATH_MIN_SCORE = 0.999
+FAST_PATH_MIN_GAP = 0.3
 
-Be strict in your matching - only return a company index if you are confident it matches the context.
+# Substring matches only count when the query is (nearly) verbatim inside the stored
+# field; looser partial alignments are left to the whole-field similarity.
+PARTIAL_MATCH_MIN_SCORE = 0.9
 
-Provide your reasoning for the selection and the index of the selected candidate (0-based indexing).
-If no candidate matches, set index to null.
+PROMPT = """
+Select the company from the candidates below that matches the query name and context.
+Compare location (city, country), industry, status, employee count and revenue.
+Be strict: return the 0-based index of the matching candidate only if you are confident, otherwise null.
+Give one sentence of reasoning.
 
 Context:
 {context}
@@ -34,7 +43,15 @@ Query Name:
 
 Candidate Companies:
 {candidates_text}
+"""
 
+BATCH_PROMPT = """
+For each query Q[i] below, select the company from that query's own candidates that matches its query name and context.
+Compare location (city, country), industry, status, employee count and revenue.
+Be strict: return the 0-based index of the matching candidate only if you are confident, otherwise null.
+Return one selection per query with its query_index and one sentence of reasoning.
+
+{queries_text}
 """
 
 class Headquarter(BaseModel):
@@ -57,24 +74,160 @@ class OutputCompanyInfo(BaseModel):
     source_systems: Optional[list[str]] = None
 
 
+# Reasoning is only logged, so longer explanations are cut rather than rejected
+REASONING_MAX_CHARS = 200
+
+
 class DocumentSelectionResult(BaseModel):
     reasoning: str
     index: Optional[int]
 
+    @field_validator("reasoning")
+    @classmethod
+    def _truncate_reasoning(cls, reasoning: str) -> str:
+        return reasoning[:REASONING_MAX_CHARS]
+
+
+class BatchDocumentSelection(BaseModel):
+    query_index: int
+    reasoning: str
+    index: Optional[int]
+
+    @field_validator("reasoning")
+    @classmethod
+    def _truncate_reasoning(cls, reasoning: str) -> str:
+        return reasoning[:REASONING_MAX_CHARS]
+
+
+class BatchDocumentSelectionResult(BaseModel):
+    selections: list[BatchDocumentSelection]
+
+
+@dataclass(frozen=True)
+class _CompanyIndex:
+    """Company records plus the derived arrays the finder searches and renders."""
+    database: list[dict]
+    # Struct-of-arrays index: lowercased name fields aligned with database indices
+    legal_names: tuple[str, ...]
+    trade_names: tuple[str, ...]
+    web_domains: tuple[str, ...]
+    # Compact text projection of each record, rendered once for LLM prompts
+    candidate_text: tuple[str, ...]
+    # Records validated once at load time and returned as-is by the finder
+    companies: tuple[OutputCompanyInfo, ...]
+    # Stripped, lowercased legal and trade names -> index of the only company with that name
+    exact_names: dict[str, int]
+
+
+# Loaded indices keyed on (absolute path, mtime) so every CompanyFinder in the
+# process reuses the same parsed database until the file changes.
+_DB_CACHE: dict[tuple[str, float], _CompanyIndex] = {}
+_DB_LOCK = threading.Lock()
+
+
+def _render_candidate(doc: dict) -> str:
+    """Render the fields used for matching as short "key: value" lines."""
+    headquarters = doc.get("headquarters") or {}
+    return (
+        f"legal_name: {doc.get('legal_name', '')}\n"
+        f"trade_name: {doc.get('trade_name', '')}\n"
+        f"status: {doc.get('status', '')}\n"
+        f"incorporation_country: {doc.get('incorporation_country', '')}\n"
+        f"industry: {', '.join(doc.get('industry') or [])}\n"
+        f"headquarters: {headquarters.get('city', '')}, {headquarters.get('country', '')}\n"
+        f"employee_band: {doc.get('employee_band', '')}\n"
+        f"revenue_band_usd: {doc.get('revenue_band_usd', '')}"
+    )
+
+
+def _read_jsonl(path: str) -> list[dict]:
+    """Decode each non-blank line of a JSONL file straight from a read-only memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [json_utils.loads(line) for line in iter(mm.readline, b"") if line.strip()]
+
+
+def _build_exact_names(database: list[dict]) -> dict[str, int]:
+    """Map each legal or trade name to its row, leaving out names shared by different companies."""
+    owners: dict[str, set] = {}
+    first_row: dict[str, int] = {}
+    for idx, doc in enumerate(database):
+        company_key = doc.get("company_id") or idx
+        for field in ("legal_name", "trade_name"):
+            name = (doc.get(field) or "").strip().lower()
+            if name:
+                owners.setdefault(name, set()).add(company_key)
+                first_row.setdefault(name, idx)
+    return {name: first_row[name] for name, companies in owners.items() if len(companies) == 1}
+
+
+def _load_company_index(path: str) -> _CompanyIndex:
+    """Load and index the company database, reusing a cached copy when unchanged."""
+    abs_path = os.path.abspath(path)
+    key = (abs_path, os.path.getmtime(abs_path))
+    with _DB_LOCK:
+        index = _DB_CACHE.get(key)
+        if index is not None:
+            return index
+        
+        logger.info(f"Loading company database from {abs_path}")
+        database = _read_jsonl(abs_path)
+        
+        index = _CompanyIndex(
+            database=database,
+            legal_names=tuple((doc.get("legal_name") or "").lower() for doc in database),
+            trade_names=tuple((doc.get("trade_name") or "").lower() for doc in database),
+            web_domains=tuple((doc.get("web_domain") or "").lower() for doc in database),
+            candidate_text=tuple(_render_candidate(doc) for doc in database),
+            companies=tuple(OutputCompanyInfo.model_validate(doc) for doc in database),
+            exact_names=_build_exact_names(database),
+        )
+        for stale_key in [k for k in _DB_CACHE if k[0] == abs_path]:
+            del _DB_CACHE[stale_key]
+        _DB_CACHE[key] = index
+        return index
+
 
 class CompanyFinder(OssBaseAgent):
-    def __init__(self, model_name: str, api_key: Optional[str] = None):
+    def __init__(self, model_name: str, api_key: Optional[str] = None, fast_path: bool = True):
         logger.info(f"Initializing CompanyFinder with model: {model_name}")
         super().__init__(model_name, api_key)
-        self.database = []
-        with open("database/enriched_companies_100.jsonl", "r") as f:
-            for line in f:
-                self.database.append(json.loads(line.strip()))
+        self.fast_path = fast_path
+        
+        index = _load_company_index(DATABASE_PATH)
+        self.database = index.database
+        self._legal_names = index.legal_names
+        self._trade_names = index.trade_names
+        self._web_domains = index.web_domains
+        self._candidate_text = index.candidate_text
+        self._companies = index.companies
+        self._exact_names = index.exact_names
+        
+        # The database is read-only after load, so search results can be reused
+        self._search_cache: dict[tuple[str, float, int], tuple[tuple[float, int], ...]] = {}
 
     def _fuzzy_search(self, input_str: str, threshold: float = 0.6, top_k: int = 3) -> list:
         """
         Fuzzy search across company records based on company name.
-        Searches in legal_name and trade_name fields only.
+        
+        Returns:
+            List of matching company records sorted by relevance
+        """
+        return [self.database[idx] for _, idx in self._fuzzy_search_indices(input_str, threshold, top_k)]
+
+    def _fuzzy_search_indices(self, input_str: str, threshold: float = 0.6, top_k: int = 3) -> list:
+        """
+        Fuzzy search across company records based on company name.
+        Searches in legal_name, trade_name and web_domain fields only.
+        
+        A field at least as long as the query is scored with fuzz.partial_ratio,
+        so a query that appears verbatim inside it scores 1.0; partial scores
+        below PARTIAL_MATCH_MIN_SCORE are ignored, so a shared word such as
+        "Global" does not make an unrelated company a candidate. Whole-field
+        misspellings are scored with a bounded normalized Levenshtein
+        similarity, which stops early once the cutoff can't be met.
         
         Args:
             input_str: Search query string
@@ -82,49 +235,102 @@ class CompanyFinder(OssBaseAgent):
             top_k: Maximum number of results to return
             
         Returns:
-            List of matching company records sorted by relevance
+            List of (score, database index) pairs sorted by relevance, one per company_id
         """
         logger.debug(f"Starting fuzzy search for: '{input_str}' (threshold={threshold}, top_k={top_k})")
         input_lower = input_str.lower()
-        results = []
+        cache_key = (input_lower, threshold, top_k)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Fuzzy search cache hit for: '{input_str}'")
+            return list(cached)
         
-        for doc in self.database:
-            max_score = 0.0
-            
-            # Search only in company name fields
-            searchable_fields = [
-                doc.get("legal_name", ""),
-                doc.get("trade_name", ""),
-                doc.get("web_domain", ""),
-            ]
-            
-            for field_value in searchable_fields:
-                field_lower = str(field_value).lower()
-                
-                # Exact substring match gets highest score
-                if input_lower in field_lower:
-                    max_score = max(max_score, 1.0)
-                    logger.debug(f"Exact match found in '{field_value}' for company {doc.get('company_id')}")
-                    break
-                
-                # Otherwise use fuzzy matching
-                similarity = fuzz.ratio(input_lower, field_lower) / 100.0
-                max_score = max(max_score, similarity)
-            
-            if max_score >= threshold:
-                results.append({"score": max_score, "document": doc})
-                logger.debug(f"Candidate found: {doc.get('company_id')} - {doc.get('trade_name')} (score={max_score:.3f})")
+        field_lists = (self._legal_names, self._trade_names, self._web_domains)
+        best_scores = {}
+        query_length = len(input_lower)
+        partial_cutoff = max(threshold, PARTIAL_MATCH_MIN_SCORE) * 100
+        
+        # Best partial or whole-field match per document, top_k per field and scorer
+        for field_values in field_lists:
+            # Only fields that can contain the query; otherwise partial_ratio would
+            # align a short stored name against a piece of a longer query
+            containing_fields = {
+                idx: value for idx, value in enumerate(field_values) if len(value) >= query_length
+            }
+            for _, score, idx in process.extract(
+                input_lower,
+                containing_fields,
+                scorer=fuzz.partial_ratio,
+                processor=None,
+                score_cutoff=partial_cutoff,
+                limit=top_k,
+            ):
+                similarity = score / 100.0
+                if similarity > best_scores.get(idx, 0.0):
+                    best_scores[idx] = similarity
+            for _, similarity, idx in process.extract(
+                input_lower,
+                field_values,
+                scorer=Levenshtein.normalized_similarity,
+                processor=None,
+                score_cutoff=threshold,
+                limit=top_k,
+            ):
+                if similarity > best_scores.get(idx, 0.0):
+                    best_scores[idx] = similarity
+        
+        # Keep one row per company_id so duplicate rows don't pad the LLM prompt
+        # or hide an otherwise unambiguous match
+        best_by_company = {}
+        for idx in sorted(best_scores):
+            company_key = self.database[idx].get("company_id") or idx
+            current = best_by_company.get(company_key)
+            if current is None or best_scores[idx] > best_scores[current]:
+                best_by_company[company_key] = idx
         
-        # Sort by score descending and return top_k
-        results.sort(key=lambda x: x["score"], reverse=True)
-        top_results = [r["document"] for r in results[:top_k]]
+        results = [
+            (best_scores[idx], idx)
+            for idx in sorted(best_by_company.values())
+            if best_scores[idx] >= threshold
+        ]
+        if logger.isEnabledFor(logging.DEBUG):
+            for score, idx in results:
+                doc = self.database[idx]
+                logger.debug("Candidate found: %s - %s (score=%.3f)", doc.get('company_id'), doc.get('trade_name'), score)
+        
+        # Select the top_k highest scores without sorting every match; ties keep index order
+        top_results = heapq.nlargest(top_k, results, key=itemgetter(0))
+        
+        if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+            self._search_cache.pop(next(iter(self._search_cache)))
+        self._search_cache[cache_key] = tuple(top_results)
         
         logger.info(f"Fuzzy search for '{input_str}' returned {len(top_results)} candidates out of {len(results)} matches")
         if top_results:
-            logger.debug(f"Top candidate: {top_results[0].get('company_id')} - {top_results[0].get('trade_name')}")
+            top_doc = self.database[top_results[0][1]]
+            logger.debug(f"Top candidate: {top_doc.get('company_id')} - {top_doc.get('trade_name')}")
         
         return top_results
 
+    def _exact_match(self, query_name: str) -> Optional[int]:
+        """Database index of the one company whose legal or trade name is exactly query_name."""
+        if not self.fast_path:
+            return None
+        return self._exact_names.get(query_name.strip().lower())
+
+    def _is_unambiguous(self, scores: list[float]) -> bool:
+        """Whether the top fuzzy match is strong and distinct enough to skip the LLM."""
+        return self.fast_path and scores[0] >= FAST_PATH_MIN_SCORE and (
+            len(scores) == 1 or scores[0] - scores[1] >= FAST_PATH_MIN_GAP
+        )
+
+    def _format_candidates(self, candidate_indices: list[int]) -> str:
+        """Format candidates for the LLM with 0-based indexing."""
+        return "\n\n".join([
+            f"Index {i}:\n{self._candidate_text[idx]}"
+            for i, idx in enumerate(candidate_indices)
+        ])
+
     async def find_documents(self, query_name: str, context: str) -> Optional[OutputCompanyInfo]:
         """
         Find the most relevant company document based on query name and context.
@@ -139,19 +345,30 @@ class CompanyFinder(OssBaseAgent):
         logger.info(f"Finding documents for query: '{query_name}'")
         logger.debug(f"Context: {context}")
         
-        top_candidates = self._fuzzy_search(query_name)
+        exact_idx = self._exact_match(query_name)
+        if exact_idx is not None:
+            logger.info(f"Exact name match, skipping fuzzy search and LLM selection: {self.database[exact_idx].get('company_id')}")
+            return self._companies[exact_idx]
+        
+        # Keep the event loop free while the search runs; rapidfuzz releases the GIL
+        scored_candidates = await asyncio.to_thread(self._fuzzy_search_indices, query_name)
         
-        if not top_candidates:
+        if not scored_candidates:
             logger.warning(f"No candidates found for query: '{query_name}'")
             return OutputCompanyInfo()
         
+        scores = [score for score, _ in scored_candidates]
+        top_indices = [idx for _, idx in scored_candidates]
+        top_candidates = [self.database[idx] for idx in top_indices]
+        
+        if self._is_unambiguous(scores):
+            selected = top_candidates[0]
+            logger.info(f"Unambiguous match, skipping LLM selection: {selected.get('company_id')} - {selected.get('trade_name')}")
+            return self._companies[top_indices[0]]
+        
         logger.info(f"Found {len(top_candidates)} candidates, sending to LLM for selection")
         
-        # Format candidates for the LLM with 0-based indexing
-        candidates_text = "\n\n".join([
-            f"Index {i}:\n{json.dumps(candidate, indent=2)}"
-            for i, candidate in enumerate(top_candidates)
-        ])
+        candidates_text = self._format_candidates(top_indices)
         
         # Construct the prompt using the template variables
         full_prompt = PROMPT.format(
@@ -167,8 +384,8 @@ class CompanyFinder(OssBaseAgent):
             result = await self.generate(
                 input=full_prompt,
                 schema=DocumentSelectionResult,
-                think=True,
-                temperature=0.3
+                think=False,
+                temperature=0.1
             )
             
             logger.debug(f"Input prompt: {full_prompt}")
@@ -184,7 +401,7 @@ class CompanyFinder(OssBaseAgent):
             if 0 <= result.index < len(top_candidates):
                 selected = top_candidates[result.index]
                 logger.info(f"Selected company: {selected.get('company_id')} - {selected.get('trade_name')}")
-                return OutputCompanyInfo(**selected)
+                return self._companies[top_indices[result.index]]
             else:
                 logger.error(f"Invalid index {result.index} returned by LLM (valid range: 0-{len(top_candidates)-1})")
                 return None
@@ -193,6 +410,91 @@ class CompanyFinder(OssBaseAgent):
             logger.error(f"Error during LLM selection: {e}", exc_info=True)
             raise
 
+    async def find_documents_batch(self, queries: list[tuple[str, str]]) -> list[Optional[OutputCompanyInfo]]:
+        """
+        Find the most relevant company document for several queries with one LLM call.
+        
+        Queries with an exact name match, no candidates or an unambiguous fuzzy
+        match are resolved locally; the rest are sent together in a single
+        batched prompt.
+        
+        Args:
+            queries: List of (query_name, context) pairs
+            
+        Returns:
+            One result per query, in order, with the same semantics as find_documents
+        """
+        logger.info(f"Finding documents for {len(queries)} queries in batch")
+        
+        results: list[Optional[OutputCompanyInfo]] = [None] * len(queries)
+        pending: list[tuple[int, list[int]]] = []
+        
+        exact_indices = [self._exact_match(query_name) for query_name, _ in queries]
+        fuzzy_queries = [i for i, exact_idx in enumerate(exact_indices) if exact_idx is None]
+        for i, exact_idx in enumerate(exact_indices):
+            if exact_idx is not None:
+                logger.info(f"Exact name match for '{queries[i][0]}', skipping fuzzy search and LLM selection")
+                results[i] = self._companies[exact_idx]
+        
+        all_scored_candidates = await asyncio.gather(*[
+            asyncio.to_thread(self._fuzzy_search_indices, queries[i][0])
+            for i in fuzzy_queries
+        ])
+        
+        for i, scored_candidates in zip(fuzzy_queries, all_scored_candidates):
+            query_name = queries[i][0]
+            if not scored_candidates:
+                logger.warning(f"No candidates found for query: '{query_name}'")
+                results[i] = OutputCompanyInfo()
+                continue
+            
+            top_indices = [idx for _, idx in scored_candidates]
+            if self._is_unambiguous([score for score, _ in scored_candidates]):
+                logger.info(f"Unambiguous match for '{query_name}', skipping LLM selection")
+                results[i] = self._companies[top_indices[0]]
+            else:
+                pending.append((i, top_indices))
+        
+        if not pending:
+            return results
+        
+        queries_text = "\n\n".join([
+            f"Q[{i}]:\nContext:\n{queries[i][1]}\n\nQuery Name:\n{queries[i][0]}\n\n"
+            f"Candidate Companies:\n{self._format_candidates(top_indices)}"
+            for i, top_indices in pending
+        ])
+        full_prompt = BATCH_PROMPT.format(queries_text=queries_text)
+        
+        logger.info(f"Sending {len(pending)} queries to LLM for batched selection")
+        logger.debug(f"Prompt length: {len(full_prompt)} characters")
+        
+        try:
+            batch_result = await self.generate(
+                input=full_prompt,
+                schema=BatchDocumentSelectionResult,
+                think=False,
+                temperature=0.1
+            )
+        except Exception as e:
+            logger.error(f"Error during batched LLM selection: {e}", exc_info=True)
+            raise
+        
+        selections = {selection.query_index: selection for selection in batch_result.selections}
+        for i, top_indices in pending:
+            selection = selections.get(i)
+            if selection is None:
+                logger.error(f"LLM returned no selection for query index {i}")
+                continue
+            if selection.index is None:
+                logger.info(f"No matching company found for query: '{queries[i][0]}'")
+                results[i] = OutputCompanyInfo()
+            elif 0 <= selection.index < len(top_indices):
+                results[i] = self._companies[top_indices[selection.index]]
+            else:
+                logger.error(f"Invalid index {selection.index} returned by LLM for query index {i} (valid range: 0-{len(top_indices)-1})")
+        
+        return results
+
 
 
 if __name__ == "__main__":
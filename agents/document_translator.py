@@ -1,29 +1,17 @@
 from agents.base_agent import OssBaseAgent
-from typing import Optional
+from typing import List, Optional
+import asyncio
 from pydantic import BaseModel
 from utils.logger import Logger
 
 logger = Logger(__name__)
 
-PROMPT = """
-You are a document translation assistant. Your task is to translate internal PDF documents from one language to another while preserving formatting, structure, and professional tone.
-
-You will be given:
-1. Target language - the language to translate to
-2. Document content - the text content extracted from the PDF (mocked)
-
-Your job is to:
-- Translate the document content accurately from the source language to the target language
-- Preserve the professional tone and formality level of the original document
-- Maintain the structure and formatting intent (headings, paragraphs, lists)
-- Keep technical terms, proper nouns, and company names consistent
+# Roughly 1k tokens of source text per translation request
+CHUNK_MAX_CHARS = 4000
 
-Return your response as a JSON object with the following fields:
-- translated_content: The full translated text
-- sections_for_review: A list of section descriptions that may need human review
-- translation_notes: Any important notes about the translation choices made
-
-Target Language: {target_language}
+PROMPT = """
+Translate the document below into {target_language}.
+Keep the professional tone, the structure (headings, paragraphs, lists) and all technical terms, proper nouns and company names.
 
 Document Content:
 {document_content}
@@ -33,6 +21,30 @@ class DocumentTranslationOutput(BaseModel):
     translated_content: str
 
 
+def split_into_chunks(document_content: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Split a document at paragraph boundaries into chunks of at most max_chars.
+    
+    Paragraphs are never split, so a single paragraph longer than max_chars
+    becomes a chunk of its own.
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for paragraph in document_content.split("\n\n"):
+        added_len = len(paragraph) + (2 if current else 0)
+        if current and current_len + added_len > max_chars:
+            chunks.append("\n\n".join(current))
+            current = []
+            current_len = 0
+            added_len = len(paragraph)
+        current.append(paragraph)
+        current_len += added_len
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
 class DocumentTranslator(OssBaseAgent):
     def __init__(self, model_name: str, api_key: Optional[str] = None):
         logger.info(f"Initializing DocumentTranslator with model: {model_name}")
@@ -46,23 +58,31 @@ class DocumentTranslator(OssBaseAgent):
         logger.info(f"Translating document to {target_language}")
         logger.debug(f"Content length: {len(document_content)} characters")
         
-        full_prompt = PROMPT.format(
-            target_language=target_language,
-            document_content=document_content
-        )
-        logger.debug(f"Prompt length: {len(full_prompt)} characters")
+        chunks = split_into_chunks(document_content)
+        prompts = [
+            PROMPT.format(target_language=target_language, document_content=chunk)
+            for chunk in chunks
+        ]
+        logger.debug(f"Split into {len(chunks)} chunks, prompt lengths: {[len(p) for p in prompts]} characters")
         
         try:
-            result = await self.generate(
-                input=full_prompt,
-                schema=DocumentTranslationOutput,
-                think=True,
-                temperature=0.3
-            )
+            results = await asyncio.gather(*[
+                self.generate(
+                    input=prompt,
+                    schema=DocumentTranslationOutput,
+                    think=True,
+                    temperature=0.3
+                )
+                for prompt in prompts
+            ])
             
             logger.info(f"Translation completed successfully")
             
-            return result
+            if len(results) == 1:
+                return results[0]
+            return DocumentTranslationOutput(
+                translated_content="\n\n".join(r.translated_content for r in results)
+            )
             
         except Exception as e:
             logger.error(f"Error during document translation: {e}", exc_info=True)
@@ -3,12 +3,17 @@ from agents.web_searcher import MockWebSearch
 from agents.company_finder import CompanyFinder
 from agents.briefing_generator import BriefingGenerator
 from agents.agent_registry import AgentRegistry, AgentParameter, ParameterType
-from tools.security_redacter import SecurityRedacter
+from tools.security_redacter import get_default_redacter
 from tools.tool_registry import ToolRegistry, ToolParameter, ParameterType as ToolParameterType
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Tuple, AsyncIterator, Union
 from pydantic import BaseModel
 from utils.logger import Logger
+from utils import json_utils
+import asyncio
 import json
+from collections import deque
+from dataclasses import dataclass
+from functools import cached_property
 
 logger = Logger(__name__)
 
@@ -27,8 +32,9 @@ Return JSON with:
 - context: Additional context about the company (string, can be empty if none provided)
 """
 
-REACT_PROMPT = """
-You are a research assistant that helps consultants by gathering information about companies and producing comprehensive briefing notes.
+_QUERY_EXTRACTION_PREFIX, _, _QUERY_EXTRACTION_SUFFIX = QUERY_EXTRACTION_PROMPT.partition("{query}")
+
+REACT_PROMPT = """You are a research assistant that helps consultants by gathering information about companies and producing comprehensive briefing notes.
 
 You have access to the following agents:
 {agents_description}
@@ -56,8 +62,11 @@ IMPORTANT RULES:
 - The security_redacter tool MUST be called on the final briefing before returning it
 - Think step by step and be thorough in your research
 - If an agent or tool fails, try alternative approaches
+"""
 
-Current step: {current_step}
+# REACT_PROMPT is sent once per query as the system message so its tokens
+# form a stable prefix across iterations; only this user message changes.
+REACT_STEP_PROMPT = """Current step: {current_step}
 Previous observations: {previous_observations}
 
 Respond with your reasoning and the next action to take.
@@ -65,6 +74,7 @@ Return JSON with:
 - reasoning: Your thought process
 - action: The agent/tool name to call (or "FINISH" if done)
 - action_input: The parameters for the agent/tool (as a dict)
+- parallel_actions: Other independent actions to run at the same time as action, each with its own action and action_input (e.g. web_search and company_finder together); an empty list if none
 - is_complete: Boolean indicating if the task is complete
 """
 
@@ -74,13 +84,30 @@ class QueryExtraction(BaseModel):
     context: str
 
 
+class ReActAction(BaseModel):
+    action: str
+    action_input: Dict[str, Any]
+
+
 class ReActStep(BaseModel):
     reasoning: str
     action: str
     action_input: Dict[str, Any]
+    parallel_actions: List[ReActAction] = []
     is_complete: bool
 
 
+_RULE = "=" * 80
+_SUBRULE = "-" * 80
+
+
+@dataclass(slots=True)
+class _PlannedAction:
+    """An action to dispatch in the current ReAct step; already validated as part of ReActStep."""
+    action: str
+    action_input: Dict[str, Any]
+
+
 class BriefingOutput(BaseModel):
     company_name: str
     briefing_content: str
@@ -102,10 +129,7 @@ class ResearchAssistant(OssBaseAgent):
         self.agent_registry = AgentRegistry()
         self.tool_registry = ToolRegistry()
         
-        self.web_search = MockWebSearch(model_name, api_key)
-        self.company_finder = CompanyFinder(model_name, api_key)
-        self.briefing_generator = BriefingGenerator(model_name, api_key)
-        self.security_redacter = SecurityRedacter()
+        self.security_redacter = get_default_redacter()
         
         self.agent_registry.register_agent(
             name="web_search",
@@ -119,7 +143,7 @@ class ResearchAssistant(OssBaseAgent):
                 )
             ],
             agent_type="search",
-            callable_func=self.web_search.search
+            callable_func=lambda **kwargs: self.web_search.search(**kwargs)
         )
         
         self.agent_registry.register_agent(
@@ -140,7 +164,7 @@ class ResearchAssistant(OssBaseAgent):
                 )
             ],
             agent_type="data_retrieval",
-            callable_func=self.company_finder.find_documents
+            callable_func=lambda **kwargs: self.company_finder.find_documents(**kwargs)
         )
         
         self.agent_registry.register_agent(
@@ -155,7 +179,7 @@ class ResearchAssistant(OssBaseAgent):
                 ),
             ],
             agent_type="analysis",
-            callable_func=self.briefing_generator.generate_briefing
+            callable_func=lambda **kwargs: self.briefing_generator.generate_briefing(**kwargs)
         )
         
         self.tool_registry.register_tool(
@@ -181,52 +205,71 @@ class ResearchAssistant(OssBaseAgent):
         )
         
         logger.info(f"Registered {len(self.agent_registry.get_agent_names())} agents and {len(self.tool_registry.get_tool_names())} tools")
+        
+        # Registrations are fixed from here on, so render their descriptions once
+        self._agents_desc = self.agent_registry.get_all_agents_description_for_llm()
+        self._tools_desc = self.tool_registry.get_all_tools_description_for_llm()
+        
+        # Action name -> ("Agent" | "Tool", callable); agents are async, tools are sync
+        self._dispatch: Dict[str, Tuple[str, Optional[Callable]]] = {
+            **{name: ("Tool", self.tool_registry.get_tool(name).callable_func)
+               for name in self.tool_registry.get_tool_names()},
+            **{name: ("Agent", self.agent_registry.get_agent(name).callable_func)
+               for name in self.agent_registry.get_agent_names()},
+        }
+    
+    # Sub-agents are built on first use, so a run that never calls one doesn't pay for it
+    @cached_property
+    def web_search(self) -> MockWebSearch:
+        return MockWebSearch(self.model_name, self._api_key)
+    
+    @cached_property
+    def company_finder(self) -> CompanyFinder:
+        return CompanyFinder(self.model_name, self._api_key)
+    
+    @cached_property
+    def briefing_generator(self) -> BriefingGenerator:
+        return BriefingGenerator(self.model_name, self._api_key)
     
     async def _execute_action(self, action: str, action_input: Dict[str, Any]) -> Dict[str, Any]:
         """Execute an agent or tool and return the result."""
-        logger.info(f"Executing action: {action}")
-        logger.debug(f"Action input: {action_input}")
-        
-        agent = self.agent_registry.get_agent(action)
-        if agent:
-            try:
-                if agent.callable_func:
-                    result = await agent.callable_func(**action_input)
-                    logger.info(f"Agent {action} executed successfully")
-                    
-                    if hasattr(result, 'model_dump'):
-                        return result.model_dump()
-                    elif action == "web_search":
-                        return {"results": [r.model_dump() for r in result.results]}
-                    return result
-                else:
-                    error_msg = f"Agent '{action}' has no callable function"
-                    logger.error(error_msg)
-                    return {"error": error_msg}
-            except Exception as e:
-                error_msg = f"Error executing agent {action}: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                return {"error": error_msg}
-        
-        tool = self.tool_registry.get_tool(action)
-        if tool:
-            try:
-                if tool.callable_func:
-                    result = tool.callable_func(**action_input)
-                    logger.info(f"Tool {action} executed successfully")
-                    return result
-                else:
-                    error_msg = f"Tool '{action}' has no callable function"
-                    logger.error(error_msg)
-                    return {"error": error_msg}
-            except Exception as e:
-                error_msg = f"Error executing tool {action}: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                return {"error": error_msg}
-        
-        error_msg = f"Action '{action}' not found in agent or tool registry"
-        logger.error(error_msg)
-        return {"error": error_msg}
+        _, result = await self._execute_action_with_type(action, action_input)
+        return result
+    
+    async def _execute_action_with_type(self, action: str, action_input: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Execute an agent or tool and return its type ("Agent", "Tool" or "Error") with the result."""
+        # Lazy %-style arguments: the action input is only rendered when DEBUG is on
+        logger.info("Executing action: %s", action)
+        logger.debug("Action input: %s", action_input)
+        
+        entry = self._dispatch.get(action)
+        if entry is None:
+            error_msg = f"Action '{action}' not found in agent or tool registry"
+            logger.error(error_msg)
+            return "Error", {"error": error_msg}
+        
+        action_type, func = entry
+        if func is None:
+            error_msg = f"{action_type} '{action}' has no callable function"
+            logger.error(error_msg)
+            return action_type, {"error": error_msg}
+        
+        try:
+            if action_type == "Agent":
+                result = await func(**action_input)
+            else:
+                # Tools are synchronous; run them off the event loop so parallel actions keep going
+                result = await asyncio.to_thread(func, **action_input)
+        except Exception as e:
+            error_msg = f"Error executing {action_type.lower()} {action}: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return action_type, {"error": error_msg}
+        
+        logger.info("%s %s executed successfully", action_type, action)
+        # Results go straight into prompts, so leave out fields the agent never set
+        if isinstance(result, BaseModel):
+            return action_type, result.model_dump(mode='python', exclude_unset=True)
+        return action_type, result
     
     async def _extract_company_info_from_query(self, query: str) -> QueryExtraction:
         """
@@ -240,7 +283,7 @@ class ResearchAssistant(OssBaseAgent):
         """
         logger.info(f"Extracting company info from query: {query}")
         
-        prompt = QUERY_EXTRACTION_PROMPT.format(query=query)
+        prompt = f"{_QUERY_EXTRACTION_PREFIX}{query}{_QUERY_EXTRACTION_SUFFIX}"
         
         extraction = await self.generate(
             input=prompt,
@@ -307,6 +350,24 @@ class ResearchAssistant(OssBaseAgent):
         
         return "\n".join(lines)
     
+    @staticmethod
+    def _record_observation(observations: deque, seen: set, observation: str) -> None:
+        """
+        Add an observation to the prompt window unless it was already shown.
+        
+        An observation whose first line matches the previous one (e.g. the same
+        agent called again) is trimmed to 300 characters.
+        """
+        observation_hash = hash(observation)
+        if observation_hash in seen:
+            logger.debug("Skipping duplicate observation")
+            return
+        seen.add(observation_hash)
+        
+        if observations and observation.partition("\n")[0] == observations[-1].partition("\n")[0]:
+            observation = observation[:300]
+        observations.append(observation)
+    
     async def research_and_generate_briefing(
         self,
         query: str,
@@ -320,6 +381,25 @@ class ResearchAssistant(OssBaseAgent):
         Returns:
             BriefingOutput with redacted briefing content
         """
+        result = None
+        async for item in self.research_and_generate_briefing_stream(query):
+            if isinstance(item, BriefingOutput):
+                result = item
+        return result
+    
+    async def research_and_generate_briefing_stream(
+        self,
+        query: str,
+    ) -> AsyncIterator[Union[str, BriefingOutput]]:
+        """
+        Research a company like research_and_generate_briefing, yielding progress as it goes.
+        
+        Args:
+            query: Natural language query about the company to research
+            
+        Yields:
+            One progress line per stage and ReAct step, then the final BriefingOutput
+        """
         logger.info(f"Starting research for query: {query}")
         
         extraction = await self._extract_company_info_from_query(query)
@@ -328,25 +408,28 @@ class ResearchAssistant(OssBaseAgent):
         
         logger.info(f"Researching company: {company_name}")
         logger.info(f"With context: {context}")
+        yield f"Researching {company_name}\n"
         
-        observations = []
+        # Only the last three distinct observations are shown to the LLM
+        observations = deque(maxlen=3)
+        seen_observations = set()
         research_steps = []
         company_profile = None
         briefing_document = None
         
-        agents_description = self.agent_registry.get_all_agents_description_for_llm()
-        tools_description = self.tool_registry.get_all_tools_description_for_llm()
+        system_prompt = REACT_PROMPT.format(
+            agents_description=self._agents_desc,
+            tools_description=self._tools_desc,
+            company_name=company_name,
+            context=context
+        )
         
         for iteration in range(self.max_iterations):
             logger.info(f"ReAct iteration {iteration + 1}/{self.max_iterations}")
             
-            previous_obs = "\n".join(observations[-3:]) if observations else "None"
+            previous_obs = "\n".join(observations) if observations else "None"
             
-            prompt = REACT_PROMPT.format(
-                agents_description=agents_description,
-                tools_description=tools_description,
-                company_name=company_name,
-                context=context,
+            prompt = REACT_STEP_PROMPT.format(
                 current_step=iteration + 1,
                 previous_observations=previous_obs
             )
@@ -356,106 +439,182 @@ class ResearchAssistant(OssBaseAgent):
                     input=prompt,
                     schema=ReActStep,
                     think=True,
-                    temperature=0.4
+                    temperature=0.4,
+                    system_prompt=system_prompt
                 )
                 
                 logger.info(f"Reasoning: {step.reasoning}")
                 logger.info(f"Action: {step.action}")
+                yield f"Step {iteration + 1}: {step.reasoning}\n"
                 
                 if step.action == "FINISH" or step.is_complete:
                     logger.info("ReAct loop completed - FINISH action received")
                     research_steps.append(f"Step {iteration + 1}: Task completed - {step.reasoning}")
                     break
                 
-                result = await self._execute_action(step.action, step.action_input)
-                
-                action_type = "Agent" if self.agent_registry.get_agent(step.action) else "Tool"
-                observation = f"{action_type}: {step.action}\nResult: {json.dumps(result, indent=2)[:500]}"
-                observations.append(observation)
-                logger.debug(f"Observation: {observation}")
-                
-                step_detail = self._format_research_step(
-                    iteration + 1,
-                    step.reasoning,
-                    step.action,
-                    action_type,
-                    step.action_input,
-                    result
+                actions = [
+                    _PlannedAction(step.action, step.action_input),
+                    *(_PlannedAction(a.action, a.action_input) for a in step.parallel_actions)
+                ]
+                results = await asyncio.gather(
+                    *[self._execute_action_with_type(a.action, a.action_input) for a in actions],
+                    return_exceptions=True
                 )
-                research_steps.append(step_detail)
+                yield f"Ran {', '.join(a.action for a in actions)}\n"
                 
-                if step.action == "company_finder" and "error" not in result:
-                    company_profile = result
-                    logger.info("Company profile retrieved successfully")
+                step_observations = []
+                step_details = []
+                for a, outcome in zip(actions, results):
+                    if isinstance(outcome, Exception):
+                        action_type, result = "Error", {"error": f"Error executing {a.action}: {str(outcome)}"}
+                    else:
+                        action_type, result = outcome
+                    # Compact JSON: the snippet is truncated anyway, so skip the indent work
+                    step_observations.append(f"{action_type}: {a.action}\nResult: {json_utils.dumps(result)[:500]}")
+                    step_details.append(self._format_research_step(
+                        iteration + 1,
+                        step.reasoning,
+                        a.action,
+                        action_type,
+                        a.action_input,
+                        result
+                    ))
+                    
+                    if a.action == "company_finder" and "error" not in result:
+                        company_profile = result
+                        logger.info("Company profile retrieved successfully")
+                    
+                    if a.action == "briefing_generator" and "error" not in result:
+                        briefing_document = result
+                        logger.info("Briefing document generated successfully")
                 
-                if step.action == "briefing_generator" and "error" not in result:
-                    briefing_document = result
-                    logger.info("Briefing document generated successfully")
+                observation = "\n".join(step_observations)
+                if len(actions) > 1:
+                    observation = f"The following actions ran in parallel: {', '.join(a.action for a in actions)}\n{observation}"
+                self._record_observation(observations, seen_observations, observation)
+                logger.debug(f"Observation: {observation}")
+                research_steps.append("\n".join(step_details))
                 
             except Exception as e:
                 error_msg = f"Error in ReAct iteration {iteration + 1}: {str(e)}"
                 logger.error(error_msg, exc_info=True)
-                observations.append(f"Error: {error_msg}")
-        
-        if not briefing_document:
-            logger.warning("No briefing document generated, creating fallback")
-            if company_profile:
-                logger.info("Generating briefing from company profile")
-                result = await self.briefing_generator.generate_briefing(
-                    company_profile
-                )
-                briefing_document = result.model_dump()
-            else:
-                raise ValueError("Unable to generate briefing: no company profile found")
+                self._record_observation(observations, seen_observations, f"Error: {error_msg}")
         
+        briefing_document = await self._finalize_briefing(briefing_document, company_profile)
         briefing_text = self._format_briefing_document(briefing_document)
         
         logger.info("Applying security redaction to briefing")
-        redaction_result = self.security_redacter.redact(briefing_text, enable_logging=True)
+        yield "Applying security redaction\n"
+        # The regex scan is CPU-bound; keep it off the loop so concurrent research runs keep going
+        redaction_result = await asyncio.to_thread(self.security_redacter.redact, briefing_text, enable_logging=True)
         
         logger.info(f"Redaction complete: {redaction_result['matches_found']} sensitive items redacted")
         
-        return BriefingOutput(
+        yield BriefingOutput(
             company_name=company_name,
             briefing_content=redaction_result["redacted_text"],
             redaction_summary=redaction_result["sensitivity_summary"],
             research_steps=research_steps
         )
     
-    def _format_briefing_document(self, briefing_doc: Dict[str, Any]) -> str:
-        """Format briefing document into readable text."""
-        lines = []
-        lines.append("=" * 80)
-        lines.append(briefing_doc.get("title", "Briefing Document"))
-        lines.append("=" * 80)
-        lines.append("")
-        lines.append("EXECUTIVE SUMMARY")
-        lines.append("-" * 80)
-        lines.append(briefing_doc.get("executive_summary", ""))
-        lines.append("")
+    async def _finalize_briefing(
+        self,
+        briefing_document: Optional[Dict[str, Any]],
+        company_profile: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return the briefing to format, building a fallback when the ReAct loop produced none.
         
-        for section in briefing_doc.get("sections", []):
-            lines.append(section.get("heading", "").upper())
-            lines.append("-" * 80)
-            lines.append(section.get("content", ""))
-            lines.append("")
+        A matched company profile is turned into a templated briefing without an LLM
+        call; the briefing generator is only used when the profile has no company name.
+        """
+        if briefing_document:
+            return briefing_document
         
-        lines.append("KEY FINDINGS")
-        lines.append("-" * 80)
-        for i, finding in enumerate(briefing_doc.get("key_findings", []), 1):
-            lines.append(f"{i}. {finding}")
-        lines.append("")
+        logger.warning("No briefing document generated, creating fallback")
+        if company_profile is None:
+            raise ValueError("Unable to generate briefing: no company profile found")
         
-        lines.append("RECOMMENDATIONS")
-        lines.append("-" * 80)
-        for i, rec in enumerate(briefing_doc.get("recommendations", []), 1):
-            lines.append(f"{i}. {rec}")
-        lines.append("")
+        if company_profile.get("trade_name") or company_profile.get("legal_name"):
+            logger.info("Building templated briefing from company profile")
+            return self._template_briefing(company_profile)
         
-        lines.append(f"RISK LEVEL: {briefing_doc.get('risk_level', 'UNKNOWN').upper()}")
-        lines.append("=" * 80)
+        logger.info("Generating briefing from company profile")
+        result = await self.briefing_generator.generate_briefing(company_profile)
+        return result.model_dump(mode='python', exclude_unset=True)
+    
+    @staticmethod
+    def _template_briefing(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a briefing document dict directly from company profile fields."""
+        name = profile.get("trade_name") or profile.get("legal_name")
+        headquarters = profile.get("headquarters") or {}
+        industries = ", ".join(profile.get("industry") or [])
+        risk_flags = profile.get("risk_flags") or []
+        
+        overview = [
+            f"{label}: {value}"
+            for label, value in (
+                ("Legal name", profile.get("legal_name")),
+                ("Status", profile.get("status")),
+                ("Incorporation country", profile.get("incorporation_country")),
+                ("Headquarters", ", ".join(v for v in (headquarters.get("city"), headquarters.get("country")) if v)),
+                ("Industry", industries),
+                ("Employees", profile.get("employee_band")),
+                ("Revenue (USD)", profile.get("revenue_band_usd")),
+                ("Website", profile.get("web_domain")),
+            )
+            if value
+        ]
+        
+        summary = f"{name} is a company"
+        if industries:
+            summary += f" operating in {industries}"
+        if headquarters.get("city"):
+            summary += f", headquartered in {headquarters['city']}"
+        summary += f". Its recorded status is {profile.get('status') or 'unknown'}"
+        summary += f" and it has {len(risk_flags)} recorded risk flag(s)." if risk_flags else " and it has no recorded risk flags."
+        
+        recommendations = [f"Review the recorded risk flags ({', '.join(risk_flags)}) before engagement"] if risk_flags else []
+        recommendations.append(
+            f"Confirm the profile, last verified on {profile['last_verified']}, against current sources"
+            if profile.get("last_verified") else "Confirm the profile against current sources"
+        )
         
-        return "\n".join(lines)
+        return {
+            "title": f"Company Briefing: {name}",
+            "executive_summary": summary,
+            "sections": [
+                {"heading": "Company Overview", "content": "\n".join(overview)},
+                {"heading": "Risk Factors", "content": "\n".join(risk_flags) or "No risk flags recorded."},
+            ],
+            "key_findings": [
+                line for line in overview if line.startswith(("Status", "Employees", "Revenue"))
+            ] + [f"Risk flag: {flag}" for flag in risk_flags],
+            "recommendations": recommendations,
+            "risk_level": "high" if len(risk_flags) > 1 else "medium" if risk_flags else "low",
+        }
+    
+    def _format_briefing_document(self, briefing_doc: Dict[str, Any]) -> str:
+        """Format briefing document into readable text."""
+        sections_block = "".join(
+            f"{section.get('heading', '').upper()}\n{_SUBRULE}\n{section.get('content', '')}\n\n"
+            for section in briefing_doc.get("sections", [])
+        )
+        findings_block = "".join(
+            f"{i}. {finding}\n" for i, finding in enumerate(briefing_doc.get("key_findings", []), 1)
+        )
+        recommendations_block = "".join(
+            f"{i}. {rec}\n" for i, rec in enumerate(briefing_doc.get("recommendations", []), 1)
+        )
+        
+        return (
+            f"{_RULE}\n{briefing_doc.get('title', 'Briefing Document')}\n{_RULE}\n\n"
+            f"EXECUTIVE SUMMARY\n{_SUBRULE}\n{briefing_doc.get('executive_summary', '')}\n\n"
+            f"{sections_block}"
+            f"KEY FINDINGS\n{_SUBRULE}\n{findings_block}\n"
+            f"RECOMMENDATIONS\n{_SUBRULE}\n{recommendations_block}\n"
+            f"RISK LEVEL: {briefing_doc.get('risk_level', 'UNKNOWN').upper()}\n{_RULE}"
+        )
 
 
 if __name__ == "__main__":
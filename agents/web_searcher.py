@@ -1,10 +1,18 @@
-from agents.base_agent import OssBaseAgent
+from agents.base_agent import LLM_CACHE_SIZE, OssBaseAgent
 from typing import Optional
 from pydantic import BaseModel
 from utils.logger import Logger
+import hashlib
+import logging
+import os
 
 logger = Logger(__name__)
 
+SEARCH_CACHE_SIZE = 256
+# Serve canned results without calling the LLM, for tests that only check result structure.
+RESARO_MOCK_SEARCH = os.getenv("RESARO_MOCK_SEARCH") == "1"
+DETERMINISTIC_RESULT_COUNT = 5
+
 PROMPT = """
 You are a web search assistant. Your task is to generate realistic and relevant web search results based on a given query.
 
@@ -37,18 +45,54 @@ class MockWebSearchOutput(BaseModel):
     results: list[MockWebSearchResult]
 
 
+# Search results as JSON keyed on (model_name, normalized query), shared by all
+# searchers so query variants that differ only in case or spacing reuse one result.
+# A hit replays one sampled output, so like the LLM response cache it is only used
+# when LLM_CACHE_SIZE turns caching on.
+_SEARCH_CACHE: dict[tuple[str, str], str] = {}
+
+
+def _normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip(" ?.!")
+
+
 # Technically we do not need LLM here, but I use LLM here to ghe mock results.
 class MockWebSearch(OssBaseAgent):
     def __init__(self, model_name: str, api_key: Optional[str] = None):
         logger.info(f"Initializing MockWebSearch with model: {model_name}")
         super().__init__(model_name, api_key)
+        self.deterministic = RESARO_MOCK_SEARCH
+    
+    @staticmethod
+    def _deterministic_results(query: str) -> MockWebSearchOutput:
+        """Build canned results derived from the query text alone."""
+        query_id = hashlib.md5(query.encode()).hexdigest()[:8]
+        return MockWebSearchOutput(results=[
+            MockWebSearchResult(
+                title=f"{query} - result {i}",
+                url=f"https://example.com/{query_id}/{i}",
+                snippet=f"Overview of {query}, covering {', '.join(query.split()[:5])}."
+            )
+            for i in range(1, DETERMINISTIC_RESULT_COUNT + 1)
+        ])
     
     async def search(self, query: str) -> MockWebSearchOutput:
-        logger.info(f"Performing web search for query: '{query}'")
-        logger.debug(f"Query length: {len(query)} characters")
+        logger.info("Performing web search for query: '%s'", query)
+        logger.debug("Query length: %d characters", len(query))
+        
+        if self.deterministic:
+            logger.info("Returning deterministic results for query: '%s'", query)
+            return self._deterministic_results(query)
+        
+        cache_key = (self.model_name, _normalize_query(query)) if LLM_CACHE_SIZE > 0 else None
+        cached = _SEARCH_CACHE.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            logger.info("Web search cache hit for query: '%s'", query)
+            return MockWebSearchOutput.model_validate_json(cached)
         
         full_prompt = PROMPT.format(query=query)
-        logger.debug(f"Prompt length: {len(full_prompt)} characters")
+        logger.debug("Prompt length: %d characters", len(full_prompt))
         
         try:
             result = await self.generate(
@@ -58,15 +102,20 @@ class MockWebSearch(OssBaseAgent):
                 temperature=0.7
             )
             
-            logger.info(f"Search completed successfully, found {len(result.results)} results")
+            logger.info("Search completed successfully, found %d results", len(result.results))
             
             if result.results:
-                logger.debug(f"Top result: {result.results[0].title}")
-                for i, res in enumerate(result.results):
-                    logger.debug(f"Result {i+1}: {res.title} - {res.url}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Top result: %s", result.results[0].title)
+                    for i, res in enumerate(result.results):
+                        logger.debug("Result %d: %s - %s", i + 1, res.title, res.url)
             else:
                 logger.warning(f"No results generated for query: '{query}'")
             
+            if cache_key is not None:
+                if len(_SEARCH_CACHE) >= SEARCH_CACHE_SIZE:
+                    _SEARCH_CACHE.pop(next(iter(_SEARCH_CACHE)))
+                _SEARCH_CACHE[cache_key] = result.model_dump_json()
             return result
             
         except Exception as e:
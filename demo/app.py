@@ -2,6 +2,8 @@ import streamlit as st
 import asyncio
 import logging
 import sys
+import threading
+from collections import deque
 from io import StringIO
 from datetime import datetime
 import os
@@ -12,29 +14,34 @@ from agents.research_assistant import ResearchAssistant
 from utils.logger import Logger
 
 
+LOG_BUFFER_SIZE = 2000
+
+
 class StreamlitLogHandler(logging.Handler):
-    """Custom log handler that captures logs for Streamlit display."""
+    """Custom log handler that captures the most recent logs for Streamlit display."""
     
-    def __init__(self):
+    def __init__(self, max_records: int = LOG_BUFFER_SIZE):
         super().__init__()
-        self.log_records = []
+        self.log_records = deque(maxlen=max_records)
         
     def emit(self, record):
         # Only capture logs from our custom Logger instances (agents.* and utils.* modules)
         if record.name.startswith('agents.') or record.name.startswith('utils.') or record.name.startswith('tools.'):
-            log_entry = self.format(record)
+            # Formatting is deferred to render time, where only displayed entries pay for it
             self.log_records.append({
-                'timestamp': datetime.fromtimestamp(record.created),
+                'record': record,
                 'level': record.levelname,
-                'message': log_entry,
                 'logger_name': record.name
             })
     
     def get_logs(self):
-        return self.log_records
+        return list(self.log_records)
+    
+    def format_log(self, log) -> str:
+        return self.format(log['record'])
     
     def clear_logs(self):
-        self.log_records = []
+        self.log_records.clear()
 
 
 def setup_logging(log_level: str, log_handler: StreamlitLogHandler):
@@ -53,18 +60,50 @@ def setup_logging(log_level: str, log_handler: StreamlitLogHandler):
     root_logger.addHandler(log_handler)
 
 
-async def run_research_assistant(query: str, model_name: str):
-    """Run the research assistant and return results."""
-    assistant = ResearchAssistant(
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Start one event loop on a background thread and reuse it across reruns.
+    
+    The cached assistant's inference clients bind to the loop they first run on,
+    so every query has to run on the same long-lived loop.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="research-assistant-loop", daemon=True).start()
+    return loop
+
+
+@st.cache_resource
+def get_research_assistant(model_name: str) -> ResearchAssistant:
+    """Build one research assistant per model and reuse it across reruns."""
+    return ResearchAssistant(
         model_name=model_name,
         max_iterations=10
     )
+
+
+def stream_research_assistant(query: str, model_name: str, outcome: dict):
+    """
+    Drive the research assistant's progress stream from Streamlit's sync context.
     
-    result = await assistant.research_and_generate_briefing(
-        query=query,
-    )
-    
-    return result
+    Yields progress lines for st.write_stream and stores the final BriefingOutput
+    in outcome["result"].
+    """
+    assistant = get_research_assistant(model_name)
+    loop = get_event_loop()
+    stream = assistant.research_and_generate_briefing_stream(query=query)
+    try:
+        while True:
+            try:
+                item = asyncio.run_coroutine_threadsafe(stream.__anext__(), loop).result()
+            except StopAsyncIteration:
+                break
+            if isinstance(item, str):
+                yield item
+            else:
+                outcome["result"] = item
+    finally:
+        asyncio.run_coroutine_threadsafe(stream.aclose(), loop).result()
 
 
 def main():
@@ -122,15 +161,19 @@ def main():
         else:
             st.session_state.log_handler.clear_logs()
             
-            with st.spinner("Researching company and generating briefing..."):
+            with st.status("Researching company and generating briefing...", expanded=True) as status:
                 try:
-                    result = asyncio.run(run_research_assistant(
+                    outcome = {}
+                    st.write_stream(stream_research_assistant(
                         query=query,
-                        model_name=model_name
+                        model_name=model_name,
+                        outcome=outcome
                     ))
-                    st.session_state.result = result
+                    st.session_state.result = outcome.get("result")
+                    status.update(label="Research complete", state="complete", expanded=False)
                     st.success("✅ Briefing generated successfully!")
                 except Exception as e:
+                    status.update(label="Research failed", state="error")
                     st.error(f"❌ Error: {str(e)}")
                     st.exception(e)
     
@@ -181,9 +224,11 @@ def main():
                     default=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
                 )
                 
+                log_handler = st.session_state.log_handler
                 filtered_logs = [log for log in logs if log['level'] in log_level_filter]
+                messages = [log_handler.format_log(log) for log in filtered_logs]
                 
-                for log in filtered_logs:
+                for log, message in zip(filtered_logs, messages):
                     level_color = {
                         'DEBUG': 'gray',
                         'INFO': 'blue',
@@ -194,15 +239,16 @@ def main():
                     
                     st.markdown(
                         f"<div style='padding: 5px; margin: 2px 0; border-left: 3px solid {level_color};'>"
-                        f"<small><strong>[{log['level']}]</strong> {log['message']}</small>"
+                        f"<small><strong>[{log['level']}]</strong> {message}</small>"
                         f"</div>",
                         unsafe_allow_html=True
                     )
                 
-                log_text = "\n".join([log['message'] for log in filtered_logs])
+                # Streamlit calls this only when the button is clicked, so ordinary
+                # reruns don't pay for joining the whole log
                 st.download_button(
                     label="📥 Download Logs",
-                    data=log_text,
+                    data=lambda: "\n".join(messages),
                     file_name=f"research_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
                     mime="text/plain"
                 )
@@ -4,9 +4,12 @@ Each query will have its own log file and output file.
 """
 
 import asyncio
+import io
 import sys
 import os
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 from pathlib import Path
 from contextvars import ContextVar
@@ -20,52 +23,231 @@ from utils.logger import Logger
 # Context variable to track which test case is currently executing
 current_test_case: ContextVar[str] = ContextVar('current_test_case', default=None)
 
+# Loggers created by this project's own modules
+CUSTOM_LOGGER_PREFIXES = ('agents.', 'tools.', 'utils.')
 
-class FileLogHandler(logging.Handler):
-    """Custom log handler that writes to a file, filtering only custom logger output for a specific test case."""
+LOG_FILE_BUFFER_SIZE = 1 << 16
+LOG_FLUSH_INTERVAL_SECONDS = 30
+
+# DEBUG records are only formatted and written to the log files when RUN_TEST_DEBUG is set
+FILE_LOG_LEVEL = logging.DEBUG if os.environ.get("RUN_TEST_DEBUG") else logging.INFO
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp for records logged within the same second."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_asctime = (None, None)
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, cached_asctime = self._last_asctime
+        if second == cached_second:
+            return cached_asctime
+        asctime = super().formatTime(record, datefmt)
+        self._last_asctime = (second, asctime)
+        return asctime
+
+
+# Shared by every test case's file and console handlers; the date format has
+# one-second resolution, so the cached timestamp is exact.
+LOG_FORMATTER = CachedTimeFormatter(
+    fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a large buffer instead of flushing every record."""
+    
+    def _open(self):
+        return io.TextIOWrapper(
+            open(self.baseFilename, 'wb', buffering=LOG_FILE_BUFFER_SIZE),
+            encoding=self.encoding or 'utf-8',
+            write_through=False,
+            line_buffering=False
+        )
+    
+    def flush(self):
+        # StreamHandler.emit flushes after every record; leave that to the buffer
+        pass
+    
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self.flush_buffer()
+    
+    def flush_buffer(self):
+        """Write any buffered log lines to disk."""
+        with self.lock:
+            if self.stream:
+                self.stream.flush()
+
+
+class TestCaseRouter(logging.Handler):
+    """
+    Root handler that hands each custom logger record to its test case's logger.
+    
+    The ContextVar is read once per record; every test case's handlers hang off
+    a dedicated non-propagating logger and only ever see that test's records.
+    """
+    
+    def __init__(self):
+        super().__init__(FILE_LOG_LEVEL)
+        self._test_loggers = {}
+    
+    def register(self, test_case_name: str) -> logging.Logger:
+        """Create the dedicated logger for a test case and start routing to it."""
+        test_logger = logging.getLogger(f"test.{test_case_name}")
+        test_logger.setLevel(FILE_LOG_LEVEL)
+        test_logger.propagate = False
+        self._test_loggers[test_case_name] = test_logger
+        return test_logger
+    
+    def unregister(self, test_case_name: str):
+        """Stop routing to a test case and detach its handlers."""
+        test_logger = self._test_loggers.pop(test_case_name, None)
+        if test_logger is not None:
+            for handler in test_logger.handlers[:]:
+                test_logger.removeHandler(handler)
     
-    def __init__(self, file_path: str, test_case_name: str):
-        super().__init__()
-        self.file_path = file_path
-        self.test_case_name = test_case_name
-        self.file = open(file_path, 'w', encoding='utf-8')
-        
     def emit(self, record):
-        # Only log if this record belongs to our test case and is from custom loggers
-        if (record.name.startswith('agents.') or record.name.startswith('tools.') or record.name.startswith('utils.')):
-            # Check if this log belongs to our test case context
-            test_context = current_test_case.get()
-            if test_context == self.test_case_name:
-                log_entry = self.format(record)
-                self.file.write(log_entry + '\n')
-                self.file.flush()
+        # Runs in the logging caller's context, so the ContextVar identifies the test case
+        if record.name.startswith(CUSTOM_LOGGER_PREFIXES):
+            test_logger = self._test_loggers.get(current_test_case.get())
+            if test_logger is not None:
+                test_logger.handle(record)
+
+
+class PrefixedConsoleHandler(logging.StreamHandler):
+    """Console handler that tags each line with its test case name."""
     
-    def close(self):
-        self.file.close()
-        super().close()
+    def __init__(self, stream, test_name):
+        super().__init__(stream)
+        self.test_name = test_name
+    
+    def emit(self, record):
+        # Add test case prefix to console output for clarity
+        original_msg = record.getMessage()
+        record.msg = f"[{self.test_name}] {original_msg}"
+        record.args = ()
+        super().emit(record)
+
+
+TEST_CASE_ROUTER = TestCaseRouter()
+
+
+def start_file_logging(file_path: str, formatter: logging.Formatter):
+    """
+    Route a test case's log records to its file through a background listener.
+    
+    Records are enqueued on the caller's thread; a QueueListener
+    thread buffers them in a MemoryHandler and writes them to the file in batches,
+    so no file I/O happens on the event loop.
+    
+    Returns:
+        (queue_handler, listener) - add the handler to a logger; stop the listener to drain and close the file
+    """
+    file_handler = BufferedFileHandler(file_path, mode='w', encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(FILE_LOG_LEVEL)
+    
+    listener = logging.handlers.QueueListener(log_queue, memory_handler)
+    listener.start()
+    return queue_handler, listener
+
+
+def flush_file_logging(listener: logging.handlers.QueueListener):
+    """Push records held by the listener's MemoryHandler through to disk."""
+    for handler in listener.handlers:
+        handler.flush()
+        if isinstance(handler, logging.handlers.MemoryHandler) and isinstance(handler.target, BufferedFileHandler):
+            handler.target.flush_buffer()
+
+
+async def periodic_log_flush(listener: logging.handlers.QueueListener, interval: float = LOG_FLUSH_INTERVAL_SECONDS):
+    """Flush a test case's buffered log file every interval seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(flush_file_logging, listener)
+
+
+def stop_file_logging(listener: logging.handlers.QueueListener):
+    """Drain the listener's queue, then flush and close its buffered file handler."""
+    listener.stop()
+    for handler in listener.handlers:
+        # MemoryHandler.close() flushes into its target and then drops the reference
+        target = handler.target if isinstance(handler, logging.handlers.MemoryHandler) else None
+        handler.close()
+        if isinstance(target, BufferedFileHandler):
+            target.flush_buffer()
+            target.close()
+
+
+_log_propagation_configured = False
 
 
 def enable_log_propagation():
-    """Enable propagation for all existing loggers so our handlers can capture logs."""
-    # Get all existing loggers and enable propagation
-    loggers_to_update = []
+    """
+    Enable propagation for all custom loggers so our handlers can capture logs.
+    
+    Runs the logger scan once per process; later calls return immediately. The
+    states are never restored, since concurrent queries share the same loggers.
+    """
+    global _log_propagation_configured
+    if _log_propagation_configured:
+        return
     for name in logging.Logger.manager.loggerDict:
-        if name.startswith('agents.') or name.startswith('tools.') or name.startswith('utils.'):
+        if name.startswith(CUSTOM_LOGGER_PREFIXES):
             logger = logging.getLogger(name)
             if hasattr(logger, 'propagate'):
-                loggers_to_update.append((logger, logger.propagate, list(logger.handlers)))
                 logger.propagate = True
-    return loggers_to_update
+    _log_propagation_configured = True
 
 
-def restore_loggers(saved_state):
-    """Restore logger states after test."""
-    for logger, old_propagate, old_handlers in saved_state:
-        logger.propagate = old_propagate
+def write_result_file(output_file: str, query_name: str, query: str, result):
+    """Write a successful test case's research steps, redaction summary and briefing."""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(f"Test Case: {query_name}\n")
+        f.write(f"Query: {query}\n")
+        f.write(f"{'='*80}\n\n")
+        
+        f.write(f"Company Name: {result.company_name}\n\n")
+        
+        f.write(f"RESEARCH STEPS:\n")
+        f.write(f"{'='*80}\n")
+        for i, step in enumerate(result.research_steps, 1):
+            f.write(f"\n{step}\n")
+        
+        f.write(f"\n\nREDACTION SUMMARY:\n")
+        f.write(f"{'='*80}\n")
+        f.write(f"{result.redaction_summary}\n\n")
+        
+        f.write(f"FINAL BRIEFING:\n")
+        f.write(f"{'='*80}\n")
+        f.write(result.briefing_content)
+
 
+def write_error_file(output_file: str, query_name: str, query: str, error: Exception):
+    """Write a failed test case's one-line error summary; the traceback is in its log file."""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(f"Test Case: {query_name}\n")
+        f.write(f"Query: {query}\n")
+        f.write(f"{'='*80}\n\n")
+        f.write(f"ERROR: {error}\n")
 
-async def run_single_query(query_name: str, query: str, output_dir: Path):
-    """Run a single query and capture logs and output."""
+
+async def run_single_query(assistant: ResearchAssistant, query_name: str, query: str, log_file: str, output_file: str):
+    """Run a single query and capture logs and output to the given file paths."""
     # Set the context for this test case so logs can be properly filtered
     current_test_case.set(query_name)
     
@@ -75,81 +257,38 @@ async def run_single_query(query_name: str, query: str, output_dir: Path):
     print(f"Query: {query}")
     print()
     
-    log_file = output_dir / f"{query_name}_logs.txt"
-    output_file = output_dir / f"{query_name}_output.txt"
-    
     # Configure root logger once
     root_logger = logging.getLogger()
     if not hasattr(root_logger, '_test_configured'):
         root_logger.handlers.clear()
-        root_logger.setLevel(logging.DEBUG)
+        root_logger.setLevel(FILE_LOG_LEVEL)
+        root_logger.addHandler(TEST_CASE_ROUTER)
+        # LOG_FORMATTER never shows them, so don't collect thread and process details per record
+        logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
         root_logger._test_configured = True
     
-    formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    # Records routed to this test case go only to its own logger's handlers
+    test_logger = TEST_CASE_ROUTER.register(query_name)
     
-    # Create file handler for this specific test - it will filter by context
-    file_handler = FileLogHandler(str(log_file), query_name)
-    file_handler.setFormatter(formatter)
-    file_handler.setLevel(logging.DEBUG)
-    
-    # Create console handler that filters output
-    class FilteredConsoleHandler(logging.StreamHandler):
-        def __init__(self, stream, test_name):
-            super().__init__(stream)
-            self.test_name = test_name
-            
-        def emit(self, record):
-            # Only show logs from our test case context
-            test_context = current_test_case.get()
-            if test_context == self.test_name:
-                if record.name.startswith('agents.') or record.name.startswith('tools.') or record.name.startswith('utils.'):
-                    # Add test case prefix to console output for clarity
-                    original_msg = record.getMessage()
-                    record.msg = f"[{self.test_name}] {original_msg}"
-                    record.args = ()
-                    super().emit(record)
-    
-    console_handler = FilteredConsoleHandler(sys.stdout, query_name)
-    console_handler.setFormatter(formatter)
+    file_handler, file_listener = start_file_logging(log_file, LOG_FORMATTER)
+    flush_task = asyncio.create_task(periodic_log_flush(file_listener))
+    
+    console_handler = PrefixedConsoleHandler(sys.stdout, query_name)
+    console_handler.setFormatter(LOG_FORMATTER)
     console_handler.setLevel(logging.INFO)  # Less verbose on console
     
-    # Add handlers for this test case
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # File first: the console handler rewrites the record's message with its prefix
+    test_logger.addHandler(file_handler)
+    test_logger.addHandler(console_handler)
     
     # Enable log propagation from agent loggers to root
-    saved_logger_state = enable_log_propagation()
+    enable_log_propagation()
     
     try:
-        assistant = ResearchAssistant(
-            model_name="Qwen/Qwen3-8B",
-            max_iterations=10
-        )
-        
         result = await assistant.research_and_generate_briefing(query=query)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"Test Case: {query_name}\n")
-            f.write(f"Query: {query}\n")
-            f.write(f"{'='*80}\n\n")
-            
-            f.write(f"Company Name: {result.company_name}\n\n")
-            
-            f.write(f"RESEARCH STEPS:\n")
-            f.write(f"{'='*80}\n")
-            for i, step in enumerate(result.research_steps, 1):
-                f.write(f"\n{step}\n")
-            
-            f.write(f"\n\nREDACTION SUMMARY:\n")
-            f.write(f"{'='*80}\n")
-            f.write(f"{result.redaction_summary}\n\n")
-            
-            f.write(f"FINAL BRIEFING:\n")
-            f.write(f"{'='*80}\n")
-            f.write(result.briefing_content)
+        # Keep the event loop free for the other queries while the file is written
+        await asyncio.to_thread(write_result_file, output_file, query_name, query, result)
         
         print(f"✅ Test case '{query_name}' completed successfully")
         print(f"   - Logs: {log_file}")
@@ -159,44 +298,30 @@ async def run_single_query(query_name: str, query: str, output_dir: Path):
             "query_name": query_name,
             "success": True,
             "result": result,
-            "log_file": str(log_file),
-            "output_file": str(output_file)
+            "log_file": log_file,
+            "output_file": output_file
         }
         
     except Exception as e:
         error_msg = f"❌ Error in test case '{query_name}': {str(e)}"
         print(error_msg)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"Test Case: {query_name}\n")
-            f.write(f"Query: {query}\n")
-            f.write(f"{'='*80}\n\n")
-            f.write(f"ERROR: {str(e)}\n")
-            f.write(f"\nFull traceback:\n")
-            import traceback
-            f.write(traceback.format_exc())
+        # The traceback goes through the buffered file logging path
+        test_logger.exception("Query failed")
+        await asyncio.to_thread(write_error_file, output_file, query_name, query, e)
         
         return {
             "query_name": query_name,
             "success": False,
             "error": str(e),
-            "log_file": str(log_file),
-            "output_file": str(output_file)
+            "log_file": log_file,
+            "output_file": output_file
         }
     
     finally:
-        # Restore logger states
-        restore_loggers(saved_logger_state)
-        
-        try:
-            file_handler.close()
-            root_logger.removeHandler(file_handler)
-        except:
-            pass
-        try:
-            root_logger.removeHandler(console_handler)
-        except:
-            pass
+        flush_task.cancel()
+        TEST_CASE_ROUTER.unregister(query_name)
+        await asyncio.to_thread(stop_file_logging, file_listener)
 
 
 async def main():
@@ -231,7 +356,23 @@ async def main():
     print("Running all test cases in parallel with isolated loggers...")
     print()
     
-    tasks = [run_single_query(test["name"], test["query"], output_dir) for test in test_queries]
+    # ResearchAssistant keeps no per-query state, so all queries share one instance
+    assistant = ResearchAssistant(
+        model_name="Qwen/Qwen3-8B",
+        max_iterations=10
+    )
+    
+    # Paths are resolved once here rather than inside each query coroutine
+    tasks = [
+        run_single_query(
+            assistant,
+            test["name"],
+            test["query"],
+            str(output_dir / f"{test['name']}_logs.txt"),
+            str(output_dir / f"{test['name']}_output.txt")
+        )
+        for test in test_queries
+    ]
     results = await asyncio.gather(*tasks)
     
     print("\n" + "="*80)
@@ -249,4 +390,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # uvloop is optional; fall back to the default event loop
+        uvloop = None
+    asyncio.run(main(), loop_factory=uvloop.new_event_loop if uvloop else None)
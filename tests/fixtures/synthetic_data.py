@@ -1,5 +1,5 @@
+import argparse
 import asyncio
-import json
 import os
 import sys
 from pathlib import Path
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from agents.base_agent import OssBaseAgent
+from utils import json_utils
 
 
 class Headquarters(BaseModel):
@@ -51,21 +52,9 @@ class GeneratedFields(BaseModel):
     )
 
 
-class SyntheticDataGenerator:
-    def __init__(self, model_name: str = "meta-llama/Llama-3.3-70B-Instruct"):
-        self.agent = OssBaseAgent(model_name=model_name)
-    
-    async def generate_missing_fields(self, company: CompanyProfile) -> GeneratedFields:
-        prompt = f"""Generate realistic products and risk categories for this company:
-
-Company: {company.trade_name}
-Industry: {', '.join(company.industry)}
-Employee Band: {company.employee_band}
-Revenue Band: {company.revenue_band_usd}
-Country: {company.incorporation_country}
-Risk Flags: {', '.join(company.risk_flags) if company.risk_flags else 'None'}
-
-Instructions:
+# Constant instructions appended after the per-company header; kept separate so
+# the prompt isn't rebuilt around them for every company.
+_PROMPT_TRAILER = """Instructions:
 1. Generate 2-5 specific, realistic products/services that match the company's industry and scale
 2. Assign 0-3 risk categories based on:
    - Industry type (e.g., weapons, gambling, crypto)
@@ -86,6 +75,39 @@ Risk Categories Available:
 - critical_infrastructure: Energy, utilities, telecom
 - none: No special risk categories"""
 
+
+def _append_and_flush(f, payload: str) -> None:
+    f.write(payload)
+    f.flush()
+
+
+def _count_records(path: Path) -> int:
+    """Count the non-blank lines of a JSONL file without decoding them."""
+    with open(path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
+class SyntheticDataGenerator:
+    def __init__(self, model_name: str = "meta-llama/Llama-3.3-70B-Instruct", validate: bool = False):
+        self.agent = OssBaseAgent(model_name=model_name)
+        # Schema validation is a debugging aid; records are read straight from our own fixtures
+        self.validate = validate
+    
+    async def generate_missing_fields(self, company: dict) -> GeneratedFields:
+        industry = ', '.join(company['industry'])
+        risk_flags = ', '.join(company['risk_flags']) if company['risk_flags'] else 'None'
+        header = f"""Generate realistic products and risk categories for this company:
+
+Company: {company['trade_name']}
+Industry: {industry}
+Employee Band: {company['employee_band']}
+Revenue Band: {company['revenue_band_usd']}
+Country: {company['incorporation_country']}
+Risk Flags: {risk_flags}
+
+"""
+        prompt = header + _PROMPT_TRAILER
+
         result = await self.agent.generate(
             input=prompt,
             schema=GeneratedFields,
@@ -97,15 +119,28 @@ Risk Categories Available:
         return result
     
     async def enrich_company(self, company_data: dict) -> dict:
-        company = CompanyProfile(**company_data)
+        """Add generated products and risk categories to company_data in place."""
+        if self.validate:
+            CompanyProfile.model_validate(company_data)
         
-        generated = await self.generate_missing_fields(company)
+        generated = await self.generate_missing_fields(company_data)
         
-        enriched_data = company_data.copy()
-        enriched_data['products'] = generated.products
-        enriched_data['risk_categories'] = generated.risk_categories
+        company_data['products'] = generated.products
+        company_data['risk_categories'] = generated.risk_categories
         
-        return enriched_data
+        return company_data
+    
+    async def _enrich_or_placeholder(self, company_data: dict, idx: int, total: int) -> dict:
+        try:
+            print(f"Processing {idx+1}/{total}: {company_data['trade_name']}")
+            enriched = await self.enrich_company(company_data)
+            print(f"✓ Completed {idx+1}/{total}: {company_data['trade_name']}")
+            return enriched
+        except Exception as e:
+            print(f"✗ Error processing {company_data['trade_name']}: {e}")
+            company_data['products'] = ["Error generating products"]
+            company_data['risk_categories'] = ["none"]
+            return company_data
     
     async def process_companies_concurrent(
         self, 
@@ -113,45 +148,70 @@ Risk Categories Available:
         output_file: Path,
         max_concurrent: int = 20
     ):
-        print(f"Reading companies from {input_file}")
-        
-        with open(input_file, 'r') as f:
-            companies = [json.loads(line) for line in f if line.strip()]
+        """
+        Enrich every company in input_file and write the results to output_file.
         
-        print(f"Loaded {len(companies)} companies")
+        Companies are streamed from the input through a bounded queue to
+        max_concurrent workers, and a single writer appends each result as soon
+        as it completes, so memory stays proportional to max_concurrent and a
+        crash keeps every record finished so far. Output is in completion order.
+        """
+        print(f"Reading companies from {input_file}")
+        # Cheap counting pass for progress output; records themselves are decoded lazily
+        total = await asyncio.to_thread(_count_records, input_file)
+        print(f"Found {total} companies")
         print(f"Processing with max {max_concurrent} concurrent requests...")
         
-        semaphore = asyncio.Semaphore(max_concurrent)
+        in_queue: asyncio.Queue = asyncio.Queue(maxsize=2 * max_concurrent)
+        out_queue: asyncio.Queue = asyncio.Queue(maxsize=2 * max_concurrent)
         
-        async def process_with_semaphore(company_data: dict, idx: int) -> dict:
-            async with semaphore:
-                try:
-                    print(f"Processing {idx+1}/{len(companies)}: {company_data['trade_name']}")
-                    enriched = await self.enrich_company(company_data)
-                    print(f"✓ Completed {idx+1}/{len(companies)}: {company_data['trade_name']}")
-                    return enriched
-                except Exception as e:
-                    print(f"✗ Error processing {company_data['trade_name']}: {e}")
-                    enriched_data = company_data.copy()
-                    enriched_data['products'] = ["Error generating products"]
-                    enriched_data['risk_categories'] = ["none"]
-                    return enriched_data
+        async def produce():
+            with open(input_file, 'rb') as f:
+                idx = 0
+                for line in f:
+                    if line.strip():
+                        await in_queue.put((idx, json_utils.loads(line)))
+                        idx += 1
+            for _ in range(max_concurrent):
+                await in_queue.put(None)
         
-        tasks = [
-            process_with_semaphore(company, idx) 
-            for idx, company in enumerate(companies)
-        ]
+        async def work():
+            while (item := await in_queue.get()) is not None:
+                idx, company_data = item
+                await out_queue.put(await self._enrich_or_placeholder(company_data, idx, total))
         
-        enriched_companies = await asyncio.gather(*tasks)
+        async def write():
+            written = 0
+            sample = None
+            done = False
+            with open(output_file, 'w', encoding='utf-8') as f:
+                while not done:
+                    # Batch whatever has completed into one write
+                    batch = [await out_queue.get()]
+                    while not out_queue.empty():
+                        batch.append(out_queue.get_nowait())
+                    if batch[-1] is None:
+                        batch.pop()
+                        done = True
+                    if not batch:
+                        continue
+                    if sample is None:
+                        sample = batch[0]
+                    payload = "".join(json_utils.dumps(company) + '\n' for company in batch)
+                    await asyncio.to_thread(_append_and_flush, f, payload)
+                    written += len(batch)
+            return written, sample
         
         print(f"\nWriting enriched data to {output_file}")
-        with open(output_file, 'w') as f:
-            for company in enriched_companies:
-                f.write(json.dumps(company) + '\n')
+        writer = asyncio.create_task(write())
+        await asyncio.gather(produce(), *[work() for _ in range(max_concurrent)])
+        await out_queue.put(None)
+        written, sample = await writer
         
-        print(f"✓ Successfully wrote {len(enriched_companies)} enriched companies")
+        print(f"✓ Successfully wrote {written} enriched companies")
         
-        self._print_sample(enriched_companies[0])
+        if sample is not None:
+            self._print_sample(sample)
     
     def _print_sample(self, company: dict):
         print("\n" + "="*80)
@@ -165,6 +225,14 @@ Risk Categories Available:
 
 
 async def main():
+    parser = argparse.ArgumentParser(description="Enrich simulated companies with generated fields")
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Validate every input record against CompanyProfile before enrichment"
+    )
+    args = parser.parse_args()
+    
     script_dir = Path(__file__).parent
     database_dir = script_dir.parent.parent / "database"
     
@@ -175,7 +243,7 @@ async def main():
         print(f"Error: Input file not found: {input_file}")
         return
     
-    generator = SyntheticDataGenerator()
+    generator = SyntheticDataGenerator(validate=args.validate)
     
     await generator.process_companies_concurrent(
         input_file=input_file,
@@ -185,4 +253,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # uvloop is optional; fall back to the default event loop
+        uvloop = None
+    asyncio.run(main(), loop_factory=uvloop.new_event_loop if uvloop else None)
@@ -1,4 +1,4 @@
-from tools.security_redacter import SecurityRedacter, SensitivityLevel, RedactionPattern
+from tools.security_redacter import SecurityRedacter, SensitivityLevel, RedactionPattern, get_default_redacter
 from tools.tool_registry import (
     ToolRegistry,
     ToolMetadata,
@@ -11,6 +11,7 @@ __all__ = [
     "SecurityRedacter",
     "SensitivityLevel",
     "RedactionPattern",
+    "get_default_redacter",
     "ToolRegistry",
     "ToolMetadata",
     "ToolParameter",
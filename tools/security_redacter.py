@@ -1,6 +1,11 @@
+import os
 import re
-from typing import List, Dict, Tuple, Set
-from dataclasses import dataclass
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import AnyStr, Callable, List, Dict, Optional, Tuple, Set, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
 
@@ -18,123 +23,248 @@ class RedactionPattern:
     replacement: str
     sensitivity: SensitivityLevel
     description: str
+    # Rejects regex hits that are not real instances, e.g. failed checksums.
+    # Called with the matched text, as bytes when redacting bytes.
+    validator: Optional[Callable[[Union[str, bytes]], bool]] = None
+    # sensitivity.value, read once per match instead of through the enum
+    sensitivity_value: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.sensitivity_value = self.sensitivity.value
+
+
+@lru_cache(maxsize=8)
+def _bytes_pattern(pattern: re.Pattern) -> re.Pattern:
+    """The same regex compiled for UTF-8 bytes; group numbers are unchanged."""
+    return re.compile(pattern.pattern.encode(), pattern.flags & ~re.UNICODE)
+
+
+# A candidate redaction: (start, end, replacement, match type, sensitivity, description)
+_Span = Tuple[int, int, str, str, str, str]
+
+# Starting counts copied for every sensitivity summary
+_EMPTY_SENSITIVITY_SUMMARY: Dict[str, int] = {level.value: 0 for level in SensitivityLevel}
+
+
+# Luhn doubling of each digit, with the digits of the product already summed
+_LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+
+def _luhn_valid(number: Union[str, bytes]) -> bool:
+    """Whether a string of digits passes the Luhn checksum used by card numbers."""
+    digits = number.encode() if isinstance(number, str) else number
+    total = sum(digits[-1::-2]) - 48 * len(digits[-1::-2])
+    total += sum(_LUHN_DOUBLED[d - 48] for d in digits[-2::-2])
+    return total % 10 == 0
+
+
+_INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+
+def _combine_patterns(patterns: List[RedactionPattern]) -> Tuple[re.Pattern, Dict[int, RedactionPattern]]:
+    """
+    Compile every pattern into one alternation so text is scanned in a single pass.
+    
+    Each pattern becomes a named group p<index> with its own flags scoped inline;
+    at any position the earliest pattern in the list that matches wins.
+    
+    Returns:
+        (combined pattern, pattern by group number) - a match's lastindex is the
+        number of the outer group that matched, since it closes after any inner group
+    """
+    alternatives = []
+    for i, pattern_obj in enumerate(patterns):
+        flags = "".join(letter for flag, letter in _INLINE_FLAGS if pattern_obj.pattern.flags & flag)
+        body = f"(?{flags}:{pattern_obj.pattern.pattern})" if flags else pattern_obj.pattern.pattern
+        alternatives.append(f"(?P<p{i}>{body})")
+    # The patterns only target ASCII data, so skip the engine's Unicode classes
+    combined = re.compile("|".join(alternatives), re.ASCII)
+    return combined, {combined.groupindex[f"p{i}"]: pattern_obj for i, pattern_obj in enumerate(patterns)}
+
+
+# Compiled once at import and shared by every SecurityRedacter
+_REDACTION_PATTERNS: List[RedactionPattern] = [
+    RedactionPattern(
+        name="email",
+        pattern=re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+        replacement="[EMAIL_REDACTED]",
+        sensitivity=SensitivityLevel.MEDIUM,
+        description="Email addresses"
+    ),
+    RedactionPattern(
+        name="phone_us",
+        pattern=re.compile(r'\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b'),
+        replacement="[PHONE_REDACTED]",
+        sensitivity=SensitivityLevel.MEDIUM,
+        description="US phone numbers"
+    ),
+    RedactionPattern(
+        name="ssn",
+        pattern=re.compile(r'\b(?!000|666|9\d{2})\d{3}-(?!00)\d{2}-(?!0000)\d{4}\b'),
+        replacement="[SSN_REDACTED]",
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="Social Security Numbers"
+    ),
+    RedactionPattern(
+        name="credit_card",
+        pattern=re.compile(r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3(?:0[0-5]|[68][0-9])[0-9]{11}|6(?:011|5[0-9]{2})[0-9]{12}|(?:2131|1800|35\d{3})\d{11})\b'),
+        replacement="[CREDIT_CARD_REDACTED]",
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="Credit card numbers",
+        validator=_luhn_valid
+    ),
+    RedactionPattern(
+        name="ipv4",
+        pattern=re.compile(r'\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b'),
+        replacement="[IP_REDACTED]",
+        sensitivity=SensitivityLevel.LOW,
+        description="IPv4 addresses"
+    ),
+    RedactionPattern(
+        name="ipv6",
+        pattern=re.compile(r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b'),
+        replacement="[IP_REDACTED]",
+        sensitivity=SensitivityLevel.LOW,
+        description="IPv6 addresses"
+    ),
+    RedactionPattern(
+        name="api_key",
+        pattern=re.compile(r'\b(?:api[_-]?key|apikey|access[_-]?key|secret[_-]?key)[\s:=]+["\']?([A-Za-z0-9_\-]{20,})["\']?\b', re.IGNORECASE),
+        replacement=r'api_key="[API_KEY_REDACTED]"',
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="API keys and access tokens"
+    ),
+    RedactionPattern(
+        name="jwt_token",
+        pattern=re.compile(r'\beyJ[A-Za-z0-9_-]*\.eyJ[A-Za-z0-9_-]*\.[A-Za-z0-9_-]*\b'),
+        replacement="[JWT_TOKEN_REDACTED]",
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="JWT tokens"
+    ),
+    RedactionPattern(
+        name="aws_key",
+        pattern=re.compile(r'\b(?:AKIA|A3T|AGPA|AIDA|AROA|AIPA|ANPA|ANVA|ASIA)[A-Z0-9]{16}\b'),
+        replacement="[AWS_KEY_REDACTED]",
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="AWS access keys"
+    ),
+    RedactionPattern(
+        name="password",
+        pattern=re.compile(r'\b(?:password|passwd|pwd)[\s:=]+["\']?([^\s"\']{6,})["\']?\b', re.IGNORECASE),
+        replacement=r'password="[PASSWORD_REDACTED]"',
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="Passwords"
+    ),
+    RedactionPattern(
+        name="private_key",
+        pattern=re.compile(r'-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----(?:[^-]++|-(?!----(?:BEGIN|END) ))*+-----END (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----'),
+        replacement="[PRIVATE_KEY_REDACTED]",
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="Private cryptographic keys"
+    ),
+    RedactionPattern(
+        name="url_with_credentials",
+        pattern=re.compile(r'\b(?:https?|ftp)://[^\s:/@]++:[^\s/@]++@[^\s]+\b'),
+        replacement="[URL_WITH_CREDENTIALS_REDACTED]",
+        sensitivity=SensitivityLevel.HIGH,
+        description="URLs with embedded credentials"
+    ),
+    RedactionPattern(
+        name="mac_address",
+        pattern=re.compile(r'\b(?:[0-9A-Fa-f]{2}[:-]){5}(?:[0-9A-Fa-f]{2})\b'),
+        replacement="[MAC_ADDRESS_REDACTED]",
+        sensitivity=SensitivityLevel.LOW,
+        description="MAC addresses"
+    ),
+    RedactionPattern(
+        name="date_of_birth",
+        pattern=re.compile(r'\b(?:0[1-9]|1[0-2])[/-](?:0[1-9]|[12][0-9]|3[01])[/-](?:19|20)\d{2}\b'),
+        replacement="[DOB_REDACTED]",
+        sensitivity=SensitivityLevel.HIGH,
+        description="Dates of birth (MM/DD/YYYY format)"
+    ),
+    RedactionPattern(
+        name="passport",
+        pattern=re.compile(r'\b[A-Z]{1,2}[0-9]{6,9}\b'),
+        replacement="[PASSPORT_REDACTED]",
+        sensitivity=SensitivityLevel.CRITICAL,
+        description="Passport numbers"
+    ),
+]
+
+# Contextual phrases redacted regardless of the exact value that follows them. They
+# are scanned together with the patterns, after them, so a pattern wins a tie.
+_RULE_BASED_PATTERNS: List[RedactionPattern] = [
+    RedactionPattern(
+        name="rule_based",
+        pattern=re.compile(pattern_str, re.IGNORECASE),
+        replacement="[SENSITIVE_INFO_REDACTED]",
+        sensitivity=SensitivityLevel.HIGH,
+        description="Rule-based detection"
+    )
+    for pattern_str in (
+        r'\b(?:confidential|secret|private|internal only|do not share)\b',
+        r'\b(?:salary|compensation|bonus)\s*[:=]\s*\$?[\d,]+(?:\.\d{2})?\b',
+        r'\b(?:username|user|login)\s*[:=]\s*["\']?([^\s"\']+)["\']?\b',
+    )
+]
+
+_DEFAULT_COMBINED_PATTERN, _DEFAULT_PATTERN_BY_GROUP = _combine_patterns(_REDACTION_PATTERNS + _RULE_BASED_PATTERNS)
+
+
+# Batches smaller than this are redacted in-process; below it a worker pool costs more than it saves
+BATCH_PARALLEL_MIN_CHARS = 1 << 18
+
+# Most recent results kept by the redaction log; statistics cover every redaction
+REDACTION_LOG_SIZE = 1024
+
+
+# Per-process copy of the batch caller's redacter, set up once by _init_batch_worker
+_BATCH_REDACTER: Optional["SecurityRedacter"] = None
+
+
+def _init_batch_worker(patterns: List[RedactionPattern], private_registry: Dict[str, Set[str]]) -> None:
+    global _BATCH_REDACTER
+    _BATCH_REDACTER = SecurityRedacter()
+    if patterns != _BATCH_REDACTER.patterns:
+        _BATCH_REDACTER.patterns = patterns
+        _BATCH_REDACTER._combined_pattern, _BATCH_REDACTER._pattern_by_group = _combine_patterns(patterns + _RULE_BASED_PATTERNS)
+    _BATCH_REDACTER.private_registry = private_registry
+
+
+def _redact_in_worker(text: str) -> Dict:
+    return _BATCH_REDACTER.redact(text, enable_logging=False)
 
 
 class SecurityRedacter:
     def __init__(self):
         self.patterns = self._initialize_patterns()
+        if self.patterns == _REDACTION_PATTERNS:
+            self._combined_pattern, self._pattern_by_group = _DEFAULT_COMBINED_PATTERN, _DEFAULT_PATTERN_BY_GROUP
+        else:
+            self._combined_pattern, self._pattern_by_group = _combine_patterns(self.patterns + _RULE_BASED_PATTERNS)
         self.private_registry = self._initialize_private_registry()
-        self.redaction_log: List[Dict] = []
+        # (pattern, literal -> (replacement, match type, description) of the category that
+        # owns it), built on first use and rebuilt after the registry changes. The pair is
+        # replaced as one attribute so concurrent scans never see a half-built registry.
+        self._registry: Optional[Tuple[re.Pattern, Dict[str, Tuple[str, str, str]]]] = None
+        self.redaction_log: deque = deque(maxlen=REDACTION_LOG_SIZE)
+        # The shared default redacter is used from worker threads; guards the log and totals
+        self._log_lock = threading.Lock()
+        self._reset_statistics()
+    
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state["_log_lock"]
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._log_lock = threading.Lock()
         
     def _initialize_patterns(self) -> List[RedactionPattern]:
         """Initialize regex patterns for detecting sensitive information."""
-        return [
-            RedactionPattern(
-                name="email",
-                pattern=re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-                replacement="[EMAIL_REDACTED]",
-                sensitivity=SensitivityLevel.MEDIUM,
-                description="Email addresses"
-            ),
-            RedactionPattern(
-                name="phone_us",
-                pattern=re.compile(r'\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b'),
-                replacement="[PHONE_REDACTED]",
-                sensitivity=SensitivityLevel.MEDIUM,
-                description="US phone numbers"
-            ),
-            RedactionPattern(
-                name="ssn",
-                pattern=re.compile(r'\b(?!000|666|9\d{2})\d{3}-(?!00)\d{2}-(?!0000)\d{4}\b'),
-                replacement="[SSN_REDACTED]",
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="Social Security Numbers"
-            ),
-            RedactionPattern(
-                name="credit_card",
-                pattern=re.compile(r'\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|3(?:0[0-5]|[68][0-9])[0-9]{11}|6(?:011|5[0-9]{2})[0-9]{12}|(?:2131|1800|35\d{3})\d{11})\b'),
-                replacement="[CREDIT_CARD_REDACTED]",
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="Credit card numbers"
-            ),
-            RedactionPattern(
-                name="ipv4",
-                pattern=re.compile(r'\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b'),
-                replacement="[IP_REDACTED]",
-                sensitivity=SensitivityLevel.LOW,
-                description="IPv4 addresses"
-            ),
-            RedactionPattern(
-                name="ipv6",
-                pattern=re.compile(r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b'),
-                replacement="[IP_REDACTED]",
-                sensitivity=SensitivityLevel.LOW,
-                description="IPv6 addresses"
-            ),
-            RedactionPattern(
-                name="api_key",
-                pattern=re.compile(r'\b(?:api[_-]?key|apikey|access[_-]?key|secret[_-]?key)[\s:=]+["\']?([A-Za-z0-9_\-]{20,})["\']?\b', re.IGNORECASE),
-                replacement=r'api_key="[API_KEY_REDACTED]"',
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="API keys and access tokens"
-            ),
-            RedactionPattern(
-                name="jwt_token",
-                pattern=re.compile(r'\beyJ[A-Za-z0-9_-]*\.eyJ[A-Za-z0-9_-]*\.[A-Za-z0-9_-]*\b'),
-                replacement="[JWT_TOKEN_REDACTED]",
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="JWT tokens"
-            ),
-            RedactionPattern(
-                name="aws_key",
-                pattern=re.compile(r'\b(?:AKIA|A3T|AGPA|AIDA|AROA|AIPA|ANPA|ANVA|ASIA)[A-Z0-9]{16}\b'),
-                replacement="[AWS_KEY_REDACTED]",
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="AWS access keys"
-            ),
-            RedactionPattern(
-                name="password",
-                pattern=re.compile(r'\b(?:password|passwd|pwd)[\s:=]+["\']?([^\s"\']{6,})["\']?\b', re.IGNORECASE),
-                replacement=r'password="[PASSWORD_REDACTED]"',
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="Passwords"
-            ),
-            RedactionPattern(
-                name="private_key",
-                pattern=re.compile(r'-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----[\s\S]*?-----END (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----'),
-                replacement="[PRIVATE_KEY_REDACTED]",
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="Private cryptographic keys"
-            ),
-            RedactionPattern(
-                name="url_with_credentials",
-                pattern=re.compile(r'\b(?:https?|ftp)://[^\s:]+:[^\s@]+@[^\s]+\b'),
-                replacement="[URL_WITH_CREDENTIALS_REDACTED]",
-                sensitivity=SensitivityLevel.HIGH,
-                description="URLs with embedded credentials"
-            ),
-            RedactionPattern(
-                name="mac_address",
-                pattern=re.compile(r'\b(?:[0-9A-Fa-f]{2}[:-]){5}(?:[0-9A-Fa-f]{2})\b'),
-                replacement="[MAC_ADDRESS_REDACTED]",
-                sensitivity=SensitivityLevel.LOW,
-                description="MAC addresses"
-            ),
-            RedactionPattern(
-                name="date_of_birth",
-                pattern=re.compile(r'\b(?:0[1-9]|1[0-2])[/-](?:0[1-9]|[12][0-9]|3[01])[/-](?:19|20)\d{2}\b'),
-                replacement="[DOB_REDACTED]",
-                sensitivity=SensitivityLevel.HIGH,
-                description="Dates of birth (MM/DD/YYYY format)"
-            ),
-            RedactionPattern(
-                name="passport",
-                pattern=re.compile(r'\b[A-Z]{1,2}[0-9]{6,9}\b'),
-                replacement="[PASSPORT_REDACTED]",
-                sensitivity=SensitivityLevel.CRITICAL,
-                description="Passport numbers"
-            ),
-        ]
+        return list(_REDACTION_PATTERNS)
     
     def _initialize_private_registry(self) -> Dict[str, Set[str]]:
         """Initialize hardcoded registry of private knowledge to filter."""
@@ -194,85 +324,97 @@ class SecurityRedacter:
         if category not in self.private_registry:
             self.private_registry[category] = set()
         self.private_registry[category].update(values)
+        self._registry = None
     
     def remove_from_registry(self, category: str, values: List[str]) -> None:
         """Remove values from the private registry."""
         if category in self.private_registry:
             self.private_registry[category].difference_update(values)
+            self._registry = None
     
-    def _apply_regex_patterns(self, text: str) -> Tuple[str, List[Dict]]:
-        """Apply regex patterns to redact sensitive information."""
-        redacted_text = text
-        matches = []
-        
-        for pattern_obj in self.patterns:
-            found_matches = list(pattern_obj.pattern.finditer(redacted_text))
-            if found_matches:
-                for match in found_matches:
-                    matches.append({
-                        "type": pattern_obj.name,
-                        "value": match.group(0),
-                        "position": match.span(),
-                        "sensitivity": pattern_obj.sensitivity.value,
-                        "description": pattern_obj.description
-                    })
-                redacted_text = pattern_obj.pattern.sub(pattern_obj.replacement, redacted_text)
-        
-        return redacted_text, matches
+    def _find_regex_matches(self, text: AnyStr) -> List[_Span]:
+        """Find sensitive information matching the patterns and rule-based phrases in one scan of the text."""
+        pattern = self._combined_pattern if isinstance(text, str) else _bytes_pattern(self._combined_pattern)
+        found = []
+        for match in pattern.finditer(text):
+            pattern_obj = self._pattern_by_group[match.lastindex]
+            if pattern_obj.validator is not None and not pattern_obj.validator(match.group(0)):
+                continue
+            found.append((
+                match.start(), match.end(), pattern_obj.replacement,
+                pattern_obj.name, pattern_obj.sensitivity_value, pattern_obj.description
+            ))
+        return found
     
-    def _apply_registry_filters(self, text: str) -> Tuple[str, List[Dict]]:
-        """Apply registry-based filtering for private knowledge."""
-        redacted_text = text
-        matches = []
+    def _compile_registry(self) -> Tuple[re.Pattern, Dict[str, Tuple[str, str, str]]]:
+        """
+        Compile every registry value into one literal alternation, longest first.
         
+        A value listed under several categories belongs to the first of them.
+        """
+        entries = {}
         for category, values in self.private_registry.items():
+            entry = (f"[{category.upper()}_REDACTED]", f"registry_{category}", f"Private registry: {category}")
             for value in values:
-                if value in redacted_text:
-                    replacement = f"[{category.upper()}_REDACTED]"
-                    count = redacted_text.count(value)
-                    
-                    for _ in range(count):
-                        start_pos = redacted_text.find(value)
-                        if start_pos != -1:
-                            matches.append({
-                                "type": f"registry_{category}",
-                                "value": value,
-                                "position": (start_pos, start_pos + len(value)),
-                                "sensitivity": SensitivityLevel.HIGH.value,
-                                "description": f"Private registry: {category}"
-                            })
-                    
-                    redacted_text = redacted_text.replace(value, replacement)
-        
-        return redacted_text, matches
+                if value:
+                    entries.setdefault(value, entry)
+        literals = sorted(entries, key=len, reverse=True)
+        # A pattern that never matches when the registry is empty
+        pattern = re.compile("|".join(map(re.escape, literals)) or r"(?!)")
+        self._registry = (pattern, entries)
+        return self._registry
     
-    def _apply_rule_based_methods(self, text: str) -> Tuple[str, List[Dict]]:
-        """Apply rule-based methods for context-aware redaction."""
-        redacted_text = text
-        matches = []
-        
-        suspicious_patterns = [
-            (r'\b(?:confidential|secret|private|internal only|do not share)\b', re.IGNORECASE),
-            (r'\b(?:salary|compensation|bonus)\s*[:=]\s*\$?[\d,]+(?:\.\d{2})?\b', re.IGNORECASE),
-            (r'\b(?:username|user|login)\s*[:=]\s*["\']?([^\s"\']+)["\']?\b', re.IGNORECASE),
-        ]
+    def _find_registry_matches(self, text: AnyStr) -> List[_Span]:
+        """Find private knowledge from the registry in one scan of the text."""
+        pattern, entries = self._registry or self._compile_registry()
+        is_bytes = isinstance(text, bytes)
+        if is_bytes:
+            pattern = _bytes_pattern(pattern)
+        sensitivity = SensitivityLevel.HIGH.value
+        found = []
+        for match in pattern.finditer(text):
+            value = match.group(0)
+            replacement, match_type, description = entries[value.decode() if is_bytes else value]
+            found.append((match.start(), match.end(), replacement, match_type, sensitivity, description))
+        return found
+    
+    @staticmethod
+    def _rewrite(text: AnyStr, found: List[_Span]) -> Tuple[AnyStr, List[Dict]]:
+        """
+        Replace every kept span in a single pass over the original text.
         
-        for pattern_str, flags in suspicious_patterns:
-            pattern = re.compile(pattern_str, flags)
-            found_matches = list(pattern.finditer(redacted_text))
-            
-            if found_matches:
-                for match in found_matches:
-                    matches.append({
-                        "type": "rule_based",
-                        "value": match.group(0),
-                        "position": match.span(),
-                        "sensitivity": SensitivityLevel.HIGH.value,
-                        "description": "Rule-based detection"
-                    })
-                redacted_text = pattern.sub("[SENSITIVE_INFO_REDACTED]", redacted_text)
+        Spans are taken leftmost first and longest first at the same start.
+        A span overlapping one already kept widens it to their union under
+        the kept span's replacement, so no part of a longer overlapping match
+        is left in the text. Equal spans keep the one found first, so regex
+        patterns beat the registry. Match details are only built for the
+        spans that are kept.
+        """
+        kept = []
+        for span in sorted(found, key=lambda span: (span[0], -span[1])):
+            if kept and span[0] < kept[-1][1]:
+                if span[1] > kept[-1][1]:
+                    kept[-1][1] = span[1]
+                continue
+            kept.append(list(span))
         
-        return redacted_text, matches
+        is_bytes = isinstance(text, bytes)
+        parts = []
+        matches = []
+        last_end = 0
+        for start, end, replacement, match_type, sensitivity, description in kept:
+            parts.append(text[last_end:start])
+            parts.append(replacement.encode() if is_bytes else replacement)
+            matches.append({
+                "type": match_type,
+                "value": text[start:end],
+                "position": (start, end),
+                "sensitivity": sensitivity,
+                "description": description
+            })
+            last_end = end
+        parts.append(text[last_end:])
+        return text[:0].join(parts), matches
     
     def redact(self, text: str, enable_logging: bool = True) -> Dict:
         """
@@ -285,17 +427,30 @@ class SecurityRedacter:
         Returns:
             Dictionary containing redacted text and metadata
         """
-        original_length = len(text)
-        all_matches = []
+        return self._redact(text, enable_logging)
+    
+    def redact_bytes(self, data: bytes, enable_logging: bool = True) -> Dict:
+        """
+        Redact UTF-8 encoded text without decoding it to a str first.
         
-        redacted_text, regex_matches = self._apply_regex_patterns(text)
-        all_matches.extend(regex_matches)
+        The result has the same shape as redact(), except that the redacted
+        text and match values are bytes and positions and lengths count bytes.
         
-        redacted_text, registry_matches = self._apply_registry_filters(redacted_text)
-        all_matches.extend(registry_matches)
+        Args:
+            data: The UTF-8 encoded text to redact
+            enable_logging: Whether to log redaction details
+            
+        Returns:
+            Dictionary containing redacted bytes and metadata
+        """
+        return self._redact(data, enable_logging)
+    
+    def _redact(self, text: AnyStr, enable_logging: bool) -> Dict:
+        original_length = len(text)
         
-        redacted_text, rule_matches = self._apply_rule_based_methods(redacted_text)
-        all_matches.extend(rule_matches)
+        found = self._find_regex_matches(text)
+        found.extend(self._find_registry_matches(text))
+        redacted_text, all_matches = self._rewrite(text, found)
         
         result = {
             "redacted_text": redacted_text,
@@ -307,50 +462,108 @@ class SecurityRedacter:
         }
         
         if enable_logging:
-            self.redaction_log.append(result)
+            self._log_result(result)
         
         return result
     
+    def redact_batch(self, texts: List[str], enable_logging: bool = True, max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Redact several texts, spreading large batches across worker processes.
+        
+        The re engine holds the GIL while it scans, so the work is split across
+        processes rather than threads. Each worker gets a copy of this redacter's
+        patterns and registry; results come back in input order.
+        
+        Args:
+            texts: The texts to redact
+            enable_logging: Whether to log redaction details
+            max_workers: Worker process count, defaulting to the number of CPUs
+            
+        Returns:
+            One redact() result per text
+        """
+        workers = max_workers or os.cpu_count() or 1
+        if workers < 2 or len(texts) < 2 or sum(map(len, texts)) < BATCH_PARALLEL_MIN_CHARS:
+            return [self.redact(text, enable_logging) for text in texts]
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(self.patterns, self.private_registry)
+        ) as pool:
+            results = list(pool.map(_redact_in_worker, texts, chunksize=max(1, len(texts) // (4 * workers))))
+        
+        if enable_logging:
+            for result in results:
+                self._log_result(result)
+        return results
+    
     def _get_sensitivity_summary(self, matches: List[Dict]) -> Dict[str, int]:
         """Generate a summary of sensitivity levels found."""
-        summary = {level.value: 0 for level in SensitivityLevel}
+        summary = _EMPTY_SENSITIVITY_SUMMARY.copy()
         for match in matches:
-            sensitivity = match.get("sensitivity", SensitivityLevel.LOW.value)
-            summary[sensitivity] = summary.get(sensitivity, 0) + 1
+            summary[match["sensitivity"]] += 1
         return summary
     
+    def _reset_statistics(self) -> None:
+        self._total_redactions = 0
+        self._total_matches = 0
+        self._total_original_length = 0
+        self._total_redacted_length = 0
+        self._sensitivity_totals = _EMPTY_SENSITIVITY_SUMMARY.copy()
+    
+    def _log_result(self, result: Dict) -> None:
+        """Keep a result in the bounded log and add it to the running statistics."""
+        with self._log_lock:
+            self.redaction_log.append(result)
+            self._total_redactions += 1
+            self._total_matches += result["matches_found"]
+            self._total_original_length += result["original_length"]
+            self._total_redacted_length += result["redacted_length"]
+            for level, count in result["sensitivity_summary"].items():
+                self._sensitivity_totals[level] += count
+    
     def get_redaction_log(self) -> List[Dict]:
-        """Return the redaction log."""
-        return self.redaction_log
+        """Return the most recent REDACTION_LOG_SIZE logged results, oldest first."""
+        with self._log_lock:
+            return list(self.redaction_log)
     
     def clear_log(self) -> None:
-        """Clear the redaction log."""
-        self.redaction_log.clear()
+        """Clear the redaction log and its statistics."""
+        with self._log_lock:
+            self.redaction_log.clear()
+            self._reset_statistics()
     
     def get_statistics(self) -> Dict:
-        """Get statistics about redactions performed."""
-        if not self.redaction_log:
+        """Get statistics about every redaction logged since the last clear."""
+        with self._log_lock:
+            return self._statistics()
+    
+    def _statistics(self) -> Dict:
+        if not self._total_redactions:
             return {"total_redactions": 0}
         
-        total_matches = sum(log["matches_found"] for log in self.redaction_log)
-        total_original_length = sum(log["original_length"] for log in self.redaction_log)
-        total_redacted_length = sum(log["redacted_length"] for log in self.redaction_log)
-        
-        all_sensitivities = {}
-        for log in self.redaction_log:
-            for level, count in log["sensitivity_summary"].items():
-                all_sensitivities[level] = all_sensitivities.get(level, 0) + count
-        
         return {
-            "total_redactions": len(self.redaction_log),
-            "total_matches_found": total_matches,
-            "total_original_length": total_original_length,
-            "total_redacted_length": total_redacted_length,
-            "average_matches_per_redaction": total_matches / len(self.redaction_log),
-            "sensitivity_breakdown": all_sensitivities
+            "total_redactions": self._total_redactions,
+            "total_matches_found": self._total_matches,
+            "total_original_length": self._total_original_length,
+            "total_redacted_length": self._total_redacted_length,
+            "average_matches_per_redaction": self._total_matches / self._total_redactions,
+            "sensitivity_breakdown": dict(self._sensitivity_totals)
         }
 
 
+@lru_cache(maxsize=1)
+def get_default_redacter() -> SecurityRedacter:
+    """
+    Return the process-wide redacter with the default patterns and registry.
+    
+    It is stateless apart from its registry and log, so callers that don't
+    customise either share it instead of each building their own.
+    """
+    return SecurityRedacter()
+
+
 def main():
     """Example usage of the SecurityRedacter."""
     redacter = SecurityRedacter()
@@ -2,6 +2,11 @@ from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 
+from tools.security_redacter import get_default_redacter
+
+
+_DESCRIPTION_SEPARATOR = "\n\n" + "=" * 80 + "\n\n"
+
 
 class ParameterType(Enum):
     STRING = "string"
@@ -30,6 +35,7 @@ class ToolMetadata:
     category: str
     callable_func: Optional[Callable] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _cached_llm_desc: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
 
 class ToolRegistry:
@@ -62,8 +68,9 @@ class ToolRegistry:
     
     def unregister_tool(self, name: str) -> None:
         """Remove a tool from the registry."""
-        if name in self._tools:
-            del self._tools[name]
+        tool = self._tools.pop(name, None)
+        if tool is not None:
+            tool._cached_llm_desc = None
     
     def get_tool(self, name: str) -> Optional[ToolMetadata]:
         """Get tool metadata by name."""
@@ -85,29 +92,29 @@ class ToolRegistry:
         if not tool:
             return f"Tool '{name}' not found"
         
-        params_desc = []
-        for param in tool.parameters:
-            required_str = "required" if param.required else "optional"
-            default_str = f", default={param.default}" if param.default is not None else ""
-            params_desc.append(
-                f"  - {param.name} ({param.type.value}, {required_str}{default_str}): {param.description}"
-            )
+        if tool._cached_llm_desc is not None:
+            return tool._cached_llm_desc
         
-        params_text = "\n".join(params_desc) if params_desc else "  No parameters"
+        params_text = "\n".join([
+            f"  - {param.name} ({param.type.value}, {'required' if param.required else 'optional'}"
+            f"{f', default={param.default}' if param.default is not None else ''}): {param.description}"
+            for param in tool.parameters
+        ]) or "  No parameters"
         
-        return f"""Tool: {tool.name}
+        tool._cached_llm_desc = f"""Tool: {tool.name}
 Category: {tool.category}
 Description: {tool.description}
 Parameters:
 {params_text}"""
+        return tool._cached_llm_desc
     
     def get_all_tools_description_for_llm(self) -> str:
         """Generate a formatted description of all tools for LLM consumption."""
-        descriptions = []
-        for name in sorted(self._tools.keys()):
-            descriptions.append(self.get_tool_description_for_llm(name))
+        descriptions = [
+            self.get_tool_description_for_llm(name) for name in sorted(self._tools.keys())
+        ]
         
-        return "\n\n" + "="*80 + "\n\n".join(descriptions)
+        return _DESCRIPTION_SEPARATOR + _DESCRIPTION_SEPARATOR.join(descriptions)
     
     def call_tool(self, name: str, **kwargs) -> Any:
         """Call a registered tool with the provided arguments."""
@@ -143,7 +150,8 @@ def create_default_tool_registry() -> ToolRegistry:
                 default=True
             )
         ],
-        category="security"
+        category="security",
+        callable_func=get_default_redacter().redact
     )
     
     return registry
@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = "~/.cache/resaro_llm"
+
+
+class PersistentResponseCache:
+    """
+    On-disk store of validated LLM responses, shared across processes and runs.
+
+    Values are JSON strings keyed on a caller-built string; entries never expire,
+    so delete the database file to start over.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        cache_path = Path(os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR))
+        cache_path.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(cache_path / "responses.sqlite", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
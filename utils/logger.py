@@ -62,6 +62,9 @@ class Logger:
 
     def log(self, level, msg, *args, **kwargs):
         self.logger.log(level, msg, *args, **kwargs)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
     
     def set_request_id(self, request_id: str):
         """Set the request/correlation ID for this context."""